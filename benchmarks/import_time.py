@@ -0,0 +1,61 @@
+# Import-time budget check based on `python -X importtime`.
+# Fails (exit code 1) if a module takes longer than its budget to import or pulls in
+# GUI/platform modules that would prevent headless use.
+#
+# usage: python benchmarks/import_time.py [--repeat N]
+
+import argparse
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# module: (cumulative budget in ms, modules it must not import)
+BUDGETS = {
+    "vref": (10, ("tkinter", "_tkinter", "ctypes", "numpy")),
+    "main": (150, ("ctypes", "numpy")),
+}
+
+
+def parse_importtime(stderr):
+    # Lines look like "import time:   self [us] | cumulative | imported package"
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        cumulative[fields[2].strip()] = int(fields[1]) / 1000
+    return cumulative
+
+
+def measure(module):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=SRC_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr}")
+    return parse_importtime(result.stderr)
+
+
+def check(module, budget_ms, forbidden, repeat):
+    # Best of several runs, the first one may include cold file system caches
+    runs = [measure(module) for _ in range(repeat)]
+    elapsed = min(run[module] for run in runs)
+    imported = [name for name in forbidden if name in runs[0]]
+
+    ok = elapsed <= budget_ms and not imported
+    print(f"{'ok  ' if ok else 'FAIL'} {module}: {elapsed:.1f} ms (budget {budget_ms} ms)")
+    if imported:
+        print(f"     imports {', '.join(imported)}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = [check(module, budget, forbidden, args.repeat) for module, (budget, forbidden) in BUDGETS.items()]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,125 @@
+# Load generator for src/server.py.
+# Opens keep-alive connections and sends POST /vref requests as fast as the server answers,
+# then reports requests (and queries) per second and latency percentiles.
+# Without --url a server is started in a subprocess on a free local port.
+#
+# usage: python benchmarks/load_server.py [--url http://127.0.0.1:8080] [--connections 16]
+#                                         [--requests 20000] [--batch 1]
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+QUERIES = [
+    {"driver": driver, "max_current_mA": current, "safety_margin": margin, "resistor": resistor}
+    for driver, resistor in (("A4988", 0.068), ("A4988", 0.1), ("DRV8825", None), ("TMC2208", None), ("TMC2209", None))
+    for current in range(0, 2001, 100)
+    for margin in (0, 10, 20, 30)
+]
+
+
+def request_bytes(host, payload):
+    body = json.dumps(payload).encode()
+    return (f"POST /vref HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+    body = await reader.readexactly(length)
+    return status, body
+
+
+async def client(host, port, count, batch, latencies, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+    errors = 0
+    try:
+        for _ in range(count):
+            queries = [rng.choice(QUERIES) for _ in range(batch)]
+            payload = queries if batch > 1 else queries[0]
+            start = time.perf_counter()
+            writer.write(request_bytes(host, payload))
+            await writer.drain()
+            status, _ = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors += 1
+    finally:
+        writer.close()
+    return errors
+
+
+async def run_load(host, port, connections, requests, batch):
+    latencies = []
+    per_connection = max(1, requests // connections)
+    start = time.perf_counter()
+    errors = await asyncio.gather(*(client(host, port, per_connection, batch, latencies, random.Random(i)) for i in range(connections)))
+    elapsed = time.perf_counter() - start
+    return elapsed, sorted(latencies), sum(errors)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port):
+    process = subprocess.Popen([sys.executable, "server.py", "--port", str(port)], cwd=SRC_DIR, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("server did not start")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator for the Vref HTTP service")
+    parser.add_argument("--url", help="server to test, by default a local server is started")
+    parser.add_argument("--connections", type=int, default=16, help="concurrent keep-alive connections (default 16)")
+    parser.add_argument("--requests", type=int, default=20000, help="total requests (default 20000)")
+    parser.add_argument("--batch", type=int, default=1, help="queries per request (default 1)")
+    args = parser.parse_args(argv)
+
+    process = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = "127.0.0.1", free_port()
+        process = start_server(port)
+
+    try:
+        elapsed, latencies, errors = asyncio.run(run_load(host, port, args.connections, args.requests, args.batch))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    count = len(latencies)
+    print(f"{count} requests ({count * args.batch} queries) over {args.connections} connections in {elapsed:.2f} s")
+    print(f"{count / elapsed:.0f} requests/s, {count * args.batch / elapsed:.0f} queries/s, {errors} errors")
+    for name, fraction in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+        print(f"{name}: {latencies[min(count - 1, int(fraction * count))] * 1000:.2f} ms")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+# Benchmark suite for the calculator's hot paths.
+# Runs headless on Linux: without a display, a virtual X server (Xvfb) is started for the
+# Tk benchmarks. Results are written as JSON and can be compared against a saved baseline.
+#
+# usage: python benchmarks/run.py [-o results.json] [--baseline baseline.json] [--save-baseline baseline.json]
+#                                 [--threshold 0.2] [--only NAME ...]
+#
+# Every benchmark reports the median and 95th percentile in ms (lower is better), the
+# throughput benchmarks additionally report operations per second.
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, "..", "src"))
+sys.path.insert(0, BENCHMARK_DIR)
+
+
+def summarize(samples, operations=1):
+    # samples are durations in seconds, each covering `operations` operations
+    samples = sorted(samples)
+    median = statistics.median(samples)
+    result = {
+        "median_ms": median * 1000 / operations,
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000 / operations,
+        "runs": len(samples),
+    }
+    if operations > 1:
+        result["ops_per_s"] = operations / median
+    return result
+
+
+######################## Display: ########################
+
+def ensure_display():
+    # Returns the Xvfb process started for the Tk benchmarks, None if a display already
+    # exists, or raises RuntimeError if there is no way to get one
+    if sys.platform == "win32" or sys.platform == "darwin" or os.environ.get("DISPLAY"):
+        return None
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        raise RuntimeError("no DISPLAY and Xvfb is not installed")
+    for number in range(99, 120):
+        if os.path.exists(f"/tmp/.X11-unix/X{number}") or os.path.exists(f"/tmp/.X{number}-lock"):
+            continue
+        process = subprocess.Popen([xvfb, f":{number}", "-screen", "0", "1920x1080x24", "-nolisten", "tcp"],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        # wait for the server socket
+        for _ in range(50):
+            if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+                os.environ["DISPLAY"] = f":{number}"
+                return process
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+        process.kill()
+    raise RuntimeError("could not start Xvfb")
+
+
+######################## Benchmarks: ########################
+
+def bench_startup(repeat):
+    # Cold start of the App up to the first painted frame, in a new interpreter every run
+    from startup import cold_start
+    return summarize([cold_start() for _ in range(repeat)])
+
+
+def bench_import(module, repeat):
+    # Cumulative import time of a module in a new interpreter, see import_time.py
+    from import_time import measure
+    return summarize([measure(module)[module] / 1000 for _ in range(repeat)])
+
+
+def bench_import_vref(repeat):
+    return bench_import("vref", repeat)
+
+
+def bench_import_main(repeat):
+    return bench_import("main", repeat)
+
+
+def bench_change_frame(repeat):
+    # Latency of switching between cached driver frames in the dropdown
+    import main
+
+    app = main.App()
+    app.update()
+    menu = app.mainMenu
+    drivers = list(menu.drivers)
+    # build every frame once, cold builds are covered by the startup benchmark
+    for driver in drivers:
+        menu.driver_types.set(driver)
+        menu.change_frame()
+    app.update()
+
+    samples = []
+    for i in range(repeat):
+        menu.driver_types.set(drivers[i % len(drivers)])
+        start = time.perf_counter()
+        menu.change_frame()
+        app.update_idletasks()
+        samples.append(time.perf_counter() - start)
+    app.on_close()
+    return summarize(samples)
+
+
+def bench_slider_update(repeat):
+    # Latency from a slider event to the updated calculation_result text
+    import main
+
+    app = main.App()
+    app.update()
+    frame = app.mainMenu.current_frame
+    top = int(frame.scale_current.cget("to"))
+    step = int(frame.scale_current.cget("resolution"))
+
+    samples = []
+    for i in range(repeat):
+        value = (i % (top // step)) * step + step
+        start = time.perf_counter()
+        # set() queues the Scale's command, which runs schedule_update in the idle cycle
+        frame.scale_current.set(value)
+        app.update_idletasks()
+        samples.append(time.perf_counter() - start)
+    app.on_close()
+    return summarize(samples)
+
+
+def bench_vref_scalar(repeat):
+    from vref import reference_voltage
+
+    count = 100_000
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(count):
+            reference_voltage("A4988", i % 2000, i % 50, 0.1)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, count)
+
+
+def bench_vref_batch(repeat):
+    import numpy as np
+    from vref import DRIVER_NAMES, reference_voltage_batch
+
+    count = 1_000_000
+    rng = np.random.default_rng(0)
+    drivers = rng.integers(0, len(DRIVER_NAMES), count)
+    currents = rng.integers(0, 26, count) * 100.0
+    margins = rng.integers(0, 51, count).astype(np.float64)
+    resistors = rng.choice([0.05, 0.1, 0.068], count)
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        reference_voltage_batch(drivers, currents, margins, resistors)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, count)
+
+
+def bench_vref_table(repeat):
+    from vref_table import get_table
+
+    table = get_table("A4988", 0.068)
+    count = 100_000
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(count):
+            table.phase_current_mA(0.1 + (i % 500) * 0.001)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, count)
+
+
+# name: (function, needs a display, default repeat)
+BENCHMARKS = {
+    "startup": (bench_startup, True, 10),
+    "import_vref": (bench_import_vref, False, 10),
+    "import_main": (bench_import_main, False, 10),
+    "change_frame": (bench_change_frame, True, 200),
+    "slider_update": (bench_slider_update, True, 500),
+    "vref_scalar": (bench_vref_scalar, False, 7),
+    "vref_batch": (bench_vref_batch, False, 7),
+    "vref_table_inverse": (bench_vref_table, False, 7),
+}
+
+
+######################## Baseline comparison: ########################
+
+def compare(results, baseline, threshold):
+    # Returns the names of benchmarks whose median got slower than baseline * (1 + threshold)
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get("benchmarks", {}).get(name)
+        if "median_ms" not in result or not reference or "median_ms" not in reference:
+            continue
+        change = result["median_ms"] / reference["median_ms"] - 1
+        marker = "REGRESSION" if change > threshold else ""
+        print(f"  {name:20} {reference['median_ms']:10.4f} ms -> {result['median_ms']:10.4f} ms  {change*100:+6.1f} %  {marker}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for the Stepper-Driver Current Calculator")
+    parser.add_argument("-o", "--output", default="bench_results.json", help="results file (default bench_results.json)")
+    parser.add_argument("--baseline", help="baseline results to compare against")
+    parser.add_argument("--save-baseline", help="also write the results to this baseline file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown against the baseline (default 0.2 = 20 %%)")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--repeat", type=int, help="override the number of runs of every benchmark")
+    args = parser.parse_args(argv)
+
+    names = args.only or list(BENCHMARKS)
+    xvfb = None
+    display_error = None
+    if any(BENCHMARKS[name][1] for name in names):
+        try:
+            xvfb = ensure_display()
+        except RuntimeError as error:
+            display_error = str(error)
+
+    results = {}
+    try:
+        for name in names:
+            function, needs_display, repeat = BENCHMARKS[name]
+            if needs_display and display_error:
+                results[name] = {"skipped": display_error}
+                print(f"{name:20} skipped: {display_error}")
+                continue
+            try:
+                result = function(args.repeat or repeat)
+            except ImportError as error:
+                results[name] = {"skipped": str(error)}
+                print(f"{name:20} skipped: {error}")
+                continue
+            results[name] = result
+            throughput = f"  {result['ops_per_s']:12.0f} ops/s" if "ops_per_s" in result else ""
+            print(f"{name:20} median {result['median_ms']:10.4f} ms  p95 {result['p95_ms']:10.4f} ms{throughput}")
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "benchmarks": results,
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        print(f"compared to {args.baseline}:")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+# Scripted slider drag: counts slider moves, handler calls and widget redraws issued.
+# Motion events arrive in bursts between idle cycles, like during a fast drag.
+#
+# usage: python benchmarks/slider_drag.py [events per idle cycle]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import main
+
+
+def drag(frame, values, burst):
+    # Set the slider like a drag would, which queues its command, processing idle
+    # callbacks after every burst of events
+    app = frame.winfo_toplevel()
+    for i, value in enumerate(values):
+        frame.scale_current.set(value)
+        if (i + 1) % burst == 0:
+            app.update_idletasks()
+    app.update_idletasks()
+
+
+if __name__ == "__main__":
+    burst = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    app = main.App()
+    app.update()
+    frame = app.mainMenu.current_frame
+    frame.events_handled = frame.redraws = 0
+
+    # drag from 0 to max and back, several motion events per slider step
+    top = int(frame.scale_current.cget("to"))
+    steps = [value for value in range(0, top + 1, 25)]
+    values = steps + steps[::-1]
+
+    start = time.perf_counter()
+    drag(frame, values, burst)
+    elapsed = time.perf_counter() - start
+
+    print(f"slider moves:   {len(values)}")
+    print(f"events handled: {frame.events_handled}")
+    print(f"redraws issued: {frame.redraws}")
+    print(f"time:           {elapsed*1000:.1f} ms")
+    app.on_close()
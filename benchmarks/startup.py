@@ -0,0 +1,60 @@
+# Measures time to first paint of the App while the driver list grows.
+# Frames are built lazily, so the numbers should stay flat with the number of drivers.
+# cold_start() measures a fresh interpreter instead, including Python startup and imports.
+#
+# usage: python benchmarks/startup.py [driver counts...]
+
+import os
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+import main
+from drivers import DRIVERS, DriverSpec
+
+
+def time_to_first_paint(driver_count):
+    # Fill the dropdown with driver_count entries by copying the existing driver specs
+    original = dict(DRIVERS)
+    specs = list(original.values())
+    DRIVERS.clear()
+    for i in range(driver_count):
+        spec = specs[i % len(specs)]
+        name = f"Driver {i}"
+        DRIVERS[name] = DriverSpec(name, spec.max_current_mA, spec.vref_gain, spec.sense_resistors, spec.current_step_mA)
+    try:
+        start = time.perf_counter()
+        app = main.App()
+        app.update()
+        elapsed = time.perf_counter() - start
+        app.on_close()
+    finally:
+        DRIVERS.clear()
+        DRIVERS.update(original)
+    return elapsed
+
+
+COLD_START = "import main; app = main.App(); app.update(); print('painted', flush=True); app.on_close()"
+
+
+def cold_start():
+    # Wall time from launching a new interpreter until the App has painted its first frame
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", COLD_START], cwd=SRC_DIR, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    elapsed = time.perf_counter() - start
+    process.stdout.read()
+    if process.wait() != 0 or line.strip() != "painted":
+        raise RuntimeError("cold start of the App failed")
+    return elapsed
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [4, 10, 25, 50, 100]
+    for count in counts:
+        # best of 3 to reduce noise from the window manager
+        best = min(time_to_first_paint(count) for _ in range(3))
+        print(f"{count:4d} drivers: {best*1000:7.1f} ms to first paint")
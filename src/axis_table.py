@@ -0,0 +1,330 @@
+# Multi-axis configuration table for whole machines and fleets.
+# Every row is one axis with its own driver, current, margin and resistor. The values are
+# stored column-wise and all Vref values are recomputed in one batched pass when inputs
+# change. The table is drawn on a canvas with a fixed set of row slots for the visible rows
+# only, so it stays responsive with thousands of axes.
+
+import tkinter as tk
+from tkinter import filedialog
+
+from drivers import DRIVERS
+from vref import DRIVER_NAMES, parse_query, reference_voltage
+
+ROW_HEIGHT = 22
+COLUMNS = (("Axis", 120), ("Driver", 90), ("Current [mA]", 110), ("Margin [%]", 90), ("Resistor [Ω]", 100), ("Vref [V]", 90))
+MACHINE_AXES = ("X", "Y", "Z", "E")
+MAX_MARGIN = 50 # same range as the margin slider of the driver frames
+
+
+def read_axes(file, first_number=1):
+    """AxisRows from a CSV file with the batch mode columns and an optional axis column.
+
+    Every row is checked before anything is returned, an invalid row raises ValueError
+    with its line number. Unnamed axes are numbered from first_number.
+    """
+    import batch
+
+    rows = AxisRows()
+    for line_number, row in batch.read_csv(file):
+        resistor = row.get("resistor")
+        try:
+            rows.add(row.get("axis") or f"Axis {first_number + len(rows)}", row["driver"], row["max_current_mA"],
+                     row["safety_margin"], resistor or None)
+        except ValueError as error:
+            raise ValueError(f"line {line_number}: {error}") from None
+    return rows
+
+
+class AxisRows:
+    # Column-wise storage of the axes. Vref values are only recomputed when dirty.
+    def __init__(self):
+        self.names = []
+        self.drivers = []
+        self.currents = []
+        self.margins = []
+        self.resistors = [] # None = driver default
+        self.vrefs = []
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def validate(driver, max_current_mA, safety_margin, resistor=None):
+        # Converted (driver, current, margin, resistor), raises ValueError before any column is touched.
+        # Currents and margins are limited like the sliders of the driver frames.
+        driver, max_current_mA, safety_margin, resistor = parse_query(driver, max_current_mA, safety_margin, resistor)
+        limit = DRIVERS[driver].max_current_mA
+        if max_current_mA > limit:
+            raise ValueError(f"{driver} supports at most {limit} mA: {max_current_mA:g}")
+        if safety_margin > MAX_MARGIN:
+            raise ValueError(f"safety margin must be between 0 and {MAX_MARGIN} %: {safety_margin:g}")
+        return driver, max_current_mA, safety_margin, resistor
+
+    def add(self, name, driver, max_current_mA, safety_margin, resistor=None):
+        driver, max_current_mA, safety_margin, resistor = self.validate(driver, max_current_mA, safety_margin, resistor)
+        self.names.append(name)
+        self.drivers.append(driver)
+        self.currents.append(max_current_mA)
+        self.margins.append(safety_margin)
+        self.resistors.append(resistor)
+        self.vrefs.append(None)
+        self.dirty = True
+
+    def update(self, index, driver, max_current_mA, safety_margin, resistor=None):
+        values = self.validate(driver, max_current_mA, safety_margin, resistor)
+        self.drivers[index], self.currents[index], self.margins[index], self.resistors[index] = values
+        self.dirty = True
+
+    def extend(self, other):
+        for column, values in ((self.names, other.names), (self.drivers, other.drivers), (self.currents, other.currents),
+                               (self.margins, other.margins), (self.resistors, other.resistors)):
+            column.extend(values)
+        self.vrefs.extend([None] * len(other))
+        self.dirty = True
+
+    def remove(self, index):
+        for column in (self.names, self.drivers, self.currents, self.margins, self.resistors, self.vrefs):
+            del column[index]
+
+    def recompute(self):
+        # One vectorized pass over all rows, or a plain loop without NumPy
+        try:
+            import numpy as np
+            from vref import reference_voltage_batch
+        except ImportError:
+            self.vrefs = [reference_voltage(*row) for row in zip(self.drivers, self.currents, self.margins, self.resistors)]
+        else:
+            codes = {name: code for code, name in enumerate(DRIVER_NAMES)}
+            resistors = np.array([np.nan if resistor is None else resistor for resistor in self.resistors], dtype=np.float64)
+            self.vrefs = reference_voltage_batch(np.array([codes[driver] for driver in self.drivers], dtype=np.intp),
+                                                 self.currents, self.margins, resistors).tolist()
+        self.dirty = False
+
+    def row_text(self, index):
+        resistor = self.resistors[index]
+        if not DRIVERS[self.drivers[index]].uses_resistor:
+            resistor_text = "-"
+        elif resistor is None:
+            resistor_text = f"{DRIVERS[self.drivers[index]].sense_resistors[0]}"
+        else:
+            resistor_text = f"{resistor}"
+        vref = self.vrefs[index]
+        return (self.names[index], self.drivers[index], f"{self.currents[index]:.0f}", f"{self.margins[index]:.0f}",
+                resistor_text, "" if vref is None else f"{vref:.3f}")
+
+
+class AxisTable(tk.Frame):
+    def __init__(self, parent, padding=10):
+        super().__init__(parent)
+        self.config(bg='#454545')
+        self.rows = AxisRows()
+        self.first_row = 0
+        self.selected = None
+        self.slots = [] # canvas items of the visible rows: (background, [texts])
+        self.pending_render = None
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+
+        # Header and virtualized rows
+        width = sum(column_width for _, column_width in COLUMNS)
+        header = tk.Canvas(self, height=ROW_HEIGHT, width=width, bg='#0F4C75', highlightthickness=0)
+        x = 0
+        for title, column_width in COLUMNS:
+            header.create_text(x + 6, ROW_HEIGHT // 2, text=title, anchor="w", fill='white', font=('Arial', 10, 'bold'))
+            x += column_width
+        header.grid(row=0, column=0, sticky="ew", padx=(padding, 0), pady=(padding, 0))
+
+        self.canvas = tk.Canvas(self, width=width, height=ROW_HEIGHT * 12, bg='white', highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.canvas.grid(row=1, column=0, sticky="nsew", padx=(padding, 0))
+        self.scrollbar.grid(row=1, column=1, sticky="ns", padx=(0, padding))
+
+        self.canvas.bind("<Configure>", lambda event: self.schedule_render())
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<MouseWheel>", lambda event: self.yview("scroll", -1 if event.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda event: self.yview("scroll", -1, "units"))
+        self.canvas.bind("<Button-5>", lambda event: self.yview("scroll", 1, "units"))
+
+        # Editor for the selected axis
+        editor = tk.Frame(self, bg='#454545')
+        editor.grid(row=2, column=0, columnspan=2, sticky="ew", padx=padding, pady=padding)
+        self.edit_driver = tk.StringVar(value=DRIVER_NAMES[0])
+        dropdown_driver = tk.OptionMenu(editor, self.edit_driver, *DRIVERS)
+        dropdown_driver.config(bg='#0F4C75', fg='white', font=('Arial', 10))
+        self.edit_current = tk.Spinbox(editor, from_=0, to=DRIVERS[DRIVER_NAMES[0]].max_current_mA, increment=100, width=6, font=('Arial', 10))
+        self.edit_margin = tk.Spinbox(editor, from_=0, to=MAX_MARGIN, increment=1, width=4, font=('Arial', 10))
+        self.edit_driver.trace_add("write", lambda *args: self.limit_editor())
+        self.edit_resistor = tk.Entry(editor, width=6, font=('Arial', 10))
+        self.set_editor(DRIVER_NAMES[0], 1000, 20, None)
+
+        labels = ("Driver", "Current [mA]", "Margin [%]", "Resistor [Ω]")
+        for column, (text, widget) in enumerate(zip(labels, (dropdown_driver, self.edit_current, self.edit_margin, self.edit_resistor))):
+            tk.Label(editor, text=text, font=('Arial', 10), bg='#454545', fg='white').grid(row=0, column=column, padx=4, sticky="w")
+            widget.grid(row=1, column=column, padx=4, sticky="ew")
+
+        buttons = (("Apply", self.apply), ("Add Axis", self.add_axis), ("Add Machine", self.add_machine),
+                   ("Remove", self.remove_axis), ("Load CSV...", self.load_csv))
+        for column, (text, command) in enumerate(buttons, start=len(labels)):
+            tk.Button(editor, text=text, font=('Arial', 10), bg='#0F4C75', fg='white', command=command).grid(row=1, column=column, padx=4)
+
+        self.status = tk.Label(self, text="", font=('Arial', 10), bg='#454545', fg='white', anchor="w")
+        self.status.grid(row=3, column=0, columnspan=2, sticky="ew", padx=padding, pady=(0, padding))
+
+    ######################## Rendering ########################
+
+    def visible_count(self):
+        return max(1, self.canvas.winfo_height() // ROW_HEIGHT + 1)
+
+    def schedule_render(self):
+        # Collapse all changes of one event cycle into one render
+        if self.pending_render is None:
+            self.pending_render = self.after_idle(self.render)
+
+    def render(self):
+        self.pending_render = None
+        if self.rows.dirty:
+            self.rows.recompute()
+
+        visible = self.visible_count()
+        self.ensure_slots(visible)
+        total = len(self.rows)
+        self.first_row = max(0, min(self.first_row, total - visible + 1))
+
+        for slot, (background, texts) in enumerate(self.slots):
+            row = self.first_row + slot
+            if row >= total:
+                self.canvas.itemconfigure(background, state="hidden")
+                for text in texts:
+                    self.canvas.itemconfigure(text, state="hidden")
+                continue
+            fill = '#BBE1FA' if row == self.selected else ('#F2F2F2' if row % 2 else 'white')
+            self.canvas.itemconfigure(background, state="normal", fill=fill)
+            for text, value in zip(texts, self.rows.row_text(row)):
+                self.canvas.itemconfigure(text, state="normal", text=value)
+
+        if total:
+            self.scrollbar.set(self.first_row / total, min(1.0, (self.first_row + visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        self.status.config(text=f"{total} axes")
+
+    def ensure_slots(self, count):
+        # Canvas items exist only for the rows that fit into the window
+        width = sum(column_width for _, column_width in COLUMNS)
+        while len(self.slots) < count:
+            y = len(self.slots) * ROW_HEIGHT
+            background = self.canvas.create_rectangle(0, y, width, y + ROW_HEIGHT, outline="", fill='white')
+            texts = []
+            x = 0
+            for _, column_width in COLUMNS:
+                texts.append(self.canvas.create_text(x + 6, y + ROW_HEIGHT // 2, text="", anchor="w", font=('Arial', 10)))
+                x += column_width
+            self.slots.append((background, texts))
+        while len(self.slots) > count:
+            background, texts = self.slots.pop()
+            self.canvas.delete(background, *texts)
+
+    def yview(self, *args):
+        total = len(self.rows)
+        visible = self.visible_count()
+        if args[0] == "moveto":
+            self.first_row = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            amount = int(args[1]) * (visible - 1 if args[2] == "pages" else 1)
+            self.first_row += amount
+        self.schedule_render()
+
+    def on_click(self, event):
+        row = self.first_row + int(self.canvas.canvasy(event.y)) // ROW_HEIGHT
+        if row >= len(self.rows):
+            return
+        self.selected = row
+        rows = self.rows
+        self.set_editor(rows.drivers[row], rows.currents[row], rows.margins[row], rows.resistors[row])
+        self.schedule_render()
+
+    ######################## Editing ########################
+
+    def set_editor(self, driver, max_current_mA, safety_margin, resistor):
+        self.edit_driver.set(driver)
+        for widget, value in ((self.edit_current, f"{max_current_mA:.0f}"), (self.edit_margin, f"{safety_margin:.0f}"),
+                              (self.edit_resistor, "" if resistor is None else f"{resistor}")):
+            widget.delete(0, "end")
+            widget.insert(0, value)
+
+    def limit_editor(self):
+        # Current range and step of the selected driver, like its slider
+        spec = DRIVERS.get(self.edit_driver.get())
+        if spec is not None:
+            self.edit_current.config(to=spec.max_current_mA, increment=spec.current_step_mA)
+
+    def editor_values(self):
+        # (driver, current, margin, resistor) from the editor, raises ValueError for invalid input
+        resistor = self.edit_resistor.get().strip()
+        return (self.edit_driver.get(), float(self.edit_current.get()), float(self.edit_margin.get()),
+                float(resistor) if resistor else None)
+
+    def apply(self):
+        if self.selected is None:
+            self.status.config(text="Select an axis first")
+            return
+        try:
+            self.rows.update(self.selected, *self.editor_values())
+        except ValueError as error:
+            self.status.config(text=f"Invalid input: {error}")
+            return
+        self.schedule_render()
+
+    def add_axis(self, name=None):
+        try:
+            values = self.editor_values()
+        except ValueError as error:
+            self.status.config(text=f"Invalid input: {error}")
+            return
+        self.rows.add(name or f"Axis {len(self.rows) + 1}", *values)
+        self.schedule_render()
+
+    def add_machine(self):
+        machine = sum(1 for name in self.rows.names if name.endswith("-X")) + 1
+        for axis in MACHINE_AXES:
+            self.add_axis(f"M{machine}-{axis}")
+
+    def remove_axis(self):
+        if self.selected is None:
+            return
+        self.rows.remove(self.selected)
+        self.selected = None
+        self.schedule_render()
+
+    def load_csv(self):
+        # All rows are parsed first, an invalid file leaves the table unchanged
+        path = filedialog.askopenfilename(filetypes=(("CSV files", "*.csv"), ("All files", "*.*")))
+        if not path:
+            return
+        try:
+            with open(path, newline="", encoding="utf-8") as file:
+                loaded = read_axes(file, len(self.rows) + 1)
+        except (OSError, ValueError) as error:
+            self.status.config(text=f"Could not load {path}: {error}")
+            return
+        self.rows.extend(loaded)
+        self.schedule_render()
+
+    def destroy(self):
+        if self.pending_render is not None:
+            self.after_cancel(self.pending_render)
+            self.pending_render = None
+        super().destroy()
+
+
+class AxisTableWindow(tk.Toplevel):
+    def __init__(self, parent, padding=10):
+        super().__init__(parent)
+        self.title("Multi-Axis Configuration")
+        self.config(bg='#454545')
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+        self.table = AxisTable(self, padding)
+        self.table.grid(row=0, column=0, sticky="nsew")
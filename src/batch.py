@@ -0,0 +1,147 @@
+# Command line batch mode: Vref for motor/driver configurations from CSV or JSONL.
+# Rows are streamed through a generator pipeline in chunks, so memory use does not
+# depend on the input size. Uses the same formulas as the GUI (vref.reference_voltage).
+#
+# Input columns / keys: driver, max_current_mA, safety_margin, resistor (optional)
+# Output: the input rows with an added vref_V column / key, in the input format.
+#
+# usage: python batch.py [input] [-o output] [--format csv|jsonl]
+#        cat configs.csv | python batch.py > results.csv
+
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+from itertools import islice
+
+from vref import parse_query, reference_voltage
+
+CHUNK_SIZE = 4096
+BUFFER_SIZE = 1 << 20
+FIELDS = ("driver", "max_current_mA", "safety_margin", "resistor")
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_csv(file):
+    # (line number, row) pairs, line numbers count the header
+    reader = csv.DictReader(file)
+    missing = [field for field in FIELDS[:3] if field not in (reader.fieldnames or ())]
+    if missing:
+        raise ValueError(f"CSV header is missing column(s): {', '.join(missing)}")
+    return ((reader.line_num, row) for row in reader)
+
+
+def read_jsonl(file):
+    # (line number, line) pairs, lines are parsed in with_vref so that --skip-invalid covers malformed JSON
+    for line_number, line in enumerate(file, start=1):
+        if line.strip():
+            yield line_number, line
+
+
+def parse_jsonl(line):
+    row = json.loads(line)
+    if not isinstance(row, dict):
+        raise ValueError("expected a JSON object")
+    return row
+
+
+def calculate(row):
+    try:
+        values = parse_query(row["driver"], row["max_current_mA"], row["safety_margin"], row.get("resistor"))
+    except KeyError as error:
+        raise ValueError(f"missing field {error}") from None
+    return reference_voltage(*values)
+
+
+def with_vref(rows, skip_invalid=False):
+    # Adds vref_V to every row; invalid rows raise, or are reported and dropped with skip_invalid
+    for line_number, row in rows:
+        try:
+            if isinstance(row, str):
+                row = parse_jsonl(row)
+            row["vref_V"] = calculate(row)
+        except ValueError as error:
+            if not skip_invalid:
+                raise ValueError(f"line {line_number}: {error}") from None
+            print(f"skipped line {line_number}: {error}", file=sys.stderr)
+            continue
+        yield row
+
+
+def run(infile, outfile, fmt, decimals=3, chunk_size=CHUNK_SIZE, skip_invalid=False):
+    """Streams Vref results from infile to outfile, returns the number of rows written."""
+    rows = read_csv(infile) if fmt == "csv" else read_jsonl(infile)
+    results = with_vref(rows, skip_invalid)
+
+    count = 0
+    writer = None
+    for chunk in chunked(results, chunk_size):
+        for row in chunk:
+            row["vref_V"] = round(row["vref_V"], decimals)
+        if fmt == "csv":
+            if writer is None:
+                writer = csv.DictWriter(outfile, fieldnames=list(chunk[0]), lineterminator="\n", extrasaction="ignore")
+                writer.writeheader()
+            writer.writerows(chunk)
+        else:
+            outfile.write("".join(json.dumps(row) + "\n" for row in chunk))
+        count += len(chunk)
+    return count
+
+
+def detect_format(path):
+    if path and path.lower().endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return "csv"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calculate Vref for driver configurations from CSV or JSONL")
+    parser.add_argument("input", nargs="?", help="input file, stdin if omitted")
+    parser.add_argument("-o", "--output", help="output file, stdout if omitted")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="input and output format, by default from the input file extension")
+    parser.add_argument("--decimals", type=int, default=3, help="decimals of vref_V (default 3)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help=f"rows per chunk (default {CHUNK_SIZE})")
+    parser.add_argument("--skip-invalid", action="store_true", help="report invalid rows on stderr and continue")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or detect_format(args.input)
+    if args.input:
+        infile = open(args.input, newline="", encoding="utf-8", buffering=BUFFER_SIZE)
+    else:
+        infile = io.TextIOWrapper(sys.stdin.buffer, newline="", encoding="utf-8")
+    if args.output:
+        outfile = open(args.output, "w", newline="", encoding="utf-8", buffering=BUFFER_SIZE)
+    else:
+        outfile = sys.stdout
+
+    start = time.perf_counter()
+    try:
+        count = run(infile, outfile, fmt, args.decimals, args.chunk_size, args.skip_invalid)
+    except ValueError as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    finally:
+        if args.input:
+            infile.close()
+        if args.output:
+            outfile.close()
+        else:
+            outfile.flush()
+    elapsed = time.perf_counter() - start
+    print(f"{count} rows in {elapsed:.2f} s ({count / max(elapsed, 1e-9):.0f} rows/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+# Supported stepper drivers.
+# Everything the calculator knows about a driver lives in its DriverSpec, so adding a
+# driver is a new entry in DRIVERS. The GUI, the Vref engine and the lookup tables
+# are all generated from this table.
+
+class DriverSpec:
+    # Vref = max_current[A] * (1 - safety_margin[%]/100) * vref_gain * sense_resistor[Ohm]
+    # sense_resistors lists the selectable resistor options, the first one is the default.
+    # Drivers without options do not use the resistor in the formula.
+    # microsteps is the number of current steps per full step of the driver's sine table.
+    # For power estimates, rds_on_ohm is the typical high side + low side MOSFET on-resistance
+    # of one H-bridge and board_resistor_ohm the sense resistor fitted on common boards of
+    # drivers without resistor options.
+    __slots__ = ("name", "max_current_mA", "vref_gain", "sense_resistors", "current_step_mA", "microsteps", "rds_on_ohm", "board_resistor_ohm")
+
+    def __init__(self, name, max_current_mA, vref_gain, sense_resistors=(), current_step_mA=100, microsteps=16, rds_on_ohm=None, board_resistor_ohm=None):
+        self.name = name
+        self.max_current_mA = max_current_mA
+        self.vref_gain = vref_gain
+        self.sense_resistors = tuple(sense_resistors)
+        self.current_step_mA = current_step_mA
+        self.microsteps = microsteps
+        self.rds_on_ohm = rds_on_ohm
+        self.board_resistor_ohm = board_resistor_ohm
+
+    def __repr__(self):
+        return f"DriverSpec({self.name!r}, max_current_mA={self.max_current_mA}, vref_gain={self.vref_gain}, sense_resistors={self.sense_resistors})"
+
+    @property
+    def uses_resistor(self):
+        return bool(self.sense_resistors)
+
+    @property
+    def resistor_options(self):
+        # Sense resistors a board with this driver can have
+        if self.sense_resistors:
+            return self.sense_resistors
+        return (self.board_resistor_ohm,) if self.board_resistor_ohm is not None else ()
+
+
+DRIVERS = {spec.name: spec for spec in (
+    DriverSpec("A4988", max_current_mA=2000, vref_gain=8.0, sense_resistors=(0.05, 0.1, 0.068), microsteps=16, rds_on_ohm=0.75),  # Vref = I * 8 * R_sense
+    DriverSpec("DRV8825", max_current_mA=2500, vref_gain=0.5, microsteps=32, rds_on_ohm=0.4, board_resistor_ohm=0.1),     # Vref = I / 2
+    DriverSpec("TMC2208", max_current_mA=1200, vref_gain=1.41, microsteps=256, rds_on_ohm=0.34, board_resistor_ohm=0.11),  # Vref = I * 1.41
+    DriverSpec("TMC2209", max_current_mA=2000, vref_gain=1.41, microsteps=256, rds_on_ohm=0.34, board_resistor_ohm=0.11),  # Vref = I * 1.41
+)}
@@ -1,20 +1,82 @@
 import tkinter as tk
-import ctypes
+import argparse
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+
+import tracing
+from drivers import DRIVERS
+from vref import reference_voltage
+
+# Widget padding in pixels, scaled with the display when the App is created
+padding = 10
+
+def probe_windows_display():
+    # Screen size in physical pixels and scaling factor from the Windows API, None on other platforms.
+    # Has to run before set_dpi_awareness(), afterwards GetSystemMetrics already reports physical pixels
+    try:
+        import ctypes
+        user32 = ctypes.windll.user32
+        screensize = user32.GetSystemMetrics(0), user32.GetSystemMetrics(1)
+        scalingFactor = ctypes.windll.shcore.GetScaleFactorForDevice(0) / 100
+    except (ImportError, AttributeError, OSError):
+        return None
+    return (int(screensize[0]*scalingFactor), int(screensize[1]*scalingFactor)), scalingFactor
+
+def set_dpi_awareness():
+    try:
+        import ctypes
+        ctypes.windll.shcore.SetProcessDpiAwareness(1)
+    except (ImportError, AttributeError, OSError):
+        pass
+
+class LoopStats:
+    # Counts event loop iterations and measures idle time per second of wall time.
+    # Busy time is the process CPU time, everything else counts as idle.
+    def __init__(self, history=60):
+        self.iterations = 0
+        self.samples = deque(maxlen=history) # (iterations per second, idle fraction)
+        self._window_start = time.perf_counter()
+        self._window_cpu = time.process_time()
+        self._window_iterations = 0
+
+    def sample(self):
+        now = time.perf_counter()
+        cpu = time.process_time()
+        wall = max(now - self._window_start, 1e-9)
+        busy = cpu - self._window_cpu
+        iterations = self.iterations - self._window_iterations
+        self.samples.append((iterations / wall, max(0.0, wall - busy) / wall))
+
+        self._window_start = now
+        self._window_cpu = cpu
+        self._window_iterations = self.iterations
+        return self.samples[-1]
+
+    def summary(self):
+        if not self.samples:
+            return "loop: no samples"
+        rate = sum(sample[0] for sample in self.samples) / len(self.samples)
+        idle = sum(sample[1] for sample in self.samples) / len(self.samples)
+        return f"loop: {self.iterations} iterations, avg {rate:.1f} iterations/s, avg {idle*100:.1f} % idle"
 
-user32 = ctypes.windll.user32
-screensize = user32.GetSystemMetrics(0), user32.GetSystemMetrics(1)
-scalingFactor = ctypes.windll.shcore.GetScaleFactorForDevice(0) / 100
-
-# Setting window size according to screen size and placing the window centered horizontally and slightly raised vertically
-windowsize = str(str(int(screensize[0]*scalingFactor*1/4))+'x'+str(int(screensize[1]*scalingFactor*1/3))+'+'+str(int(screensize[0]*scalingFactor*1/8))+'+'+str(int(screensize[1]*scalingFactor*1/12)))
+class App(tk.Tk):
+    def __init__(self, display=None): #constructor
+        super().__init__()
 
-padding = int(10*scalingFactor)
+        # display is (screensize in physical pixels, scalingFactor) as returned by
+        # probe_windows_display(), otherwise Tk's own screen information is used
+        if display is None:
+            display = (self.winfo_screenwidth(), self.winfo_screenheight()), self.winfo_fpixels('1i') / 96
+        screensize, scalingFactor = display
 
-ctypes.windll.shcore.SetProcessDpiAwareness(1)
+        # Setting window size according to screen size and placing the window centered horizontally and slightly raised vertically
+        windowsize = str(str(int(screensize[0]*1/4))+'x'+str(int(screensize[1]*1/3))+'+'+str(int(screensize[0]*1/8))+'+'+str(int(screensize[1]*1/12)))
 
-class App(tk.Tk):
-    def __init__(self): #constructor
-        super().__init__()
+        global padding
+        padding = int(10*scalingFactor)
 
         # main setup
         self.config(bg='#272829')
@@ -29,21 +91,56 @@ class App(tk.Tk):
         self.turned_on = True
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
+        # event loop instrumentation, printed to stdout when STEPPER_LOOP_STATS is set
+        self.loop_stats = LoopStats()
+        self.print_loop_stats = bool(os.environ.get("STEPPER_LOOP_STATS"))
+        self.after(1000, self.sample_loop_stats)
+
         # widgets
         self.mainMenu = MainMenu(self)
         self.mainMenu.grid(row=0, column=0, sticky="nsew")
 
-        #run
+    def run(self):
+        if tracing.tracer is not None:
+            self.run_traced(tracing.tracer)
+            return
+
+        # dooneevent() blocks until Tk has an event to handle, so the process sleeps
+        # while the calculator is idle instead of spinning on update()
+        while(self.turned_on):
+            self.tk.dooneevent(0)
+            self.loop_stats.iterations += 1
+
+    def run_traced(self, tracer):
+        # Same loop, recording the CPU time of every iteration. Wall time would mostly
+        # be the time spent waiting for the next event. Thread time excludes background
+        # workers, and the iterations stay out of the slowest calls list, where their
+        # stack would always be this loop.
+        buffer = tracer.buffer("App.run iteration (cpu)")
         while(self.turned_on):
-            self.update()
+            start = time.thread_time()
+            self.tk.dooneevent(0)
+            self.loop_stats.iterations += 1
+            buffer.append(time.thread_time() - start)
+
+    def sample_loop_stats(self):
+        if not self.turned_on:
+            return
+        rate, idle = self.loop_stats.sample()
+        if self.print_loop_stats:
+            print(f"loop: {rate:.1f} iterations/s, {idle*100:.1f} % idle")
+        self.after(1000, self.sample_loop_stats)
 
     def on_close(self):
         self.turned_on  = False
         self.destroy()
+        if self.print_loop_stats:
+            self.loop_stats.sample()
+            print(self.loop_stats.summary())
         assert('terminated successfully!')
 
 class MainMenu(tk.Frame):
-    def __init__(self, parent):
+    def __init__(self, parent, drivers=None, max_cached_frames=8):
         super().__init__(parent)
         self.config(bg='#272829')
 
@@ -51,136 +148,94 @@ class MainMenu(tk.Frame):
         self.rowconfigure(0, weight=1)
         self.rowconfigure(1, weight=1)
         self.rowconfigure(2, weight=30)
+        self.rowconfigure(3, weight=1)
 
         label = tk.Label(self, text="Stepper Driver Type:", font=('Arial', 18), bg='#0F4C75', fg='white')
         label.grid(row=0, column=0, sticky="nsew", pady=padding, padx=padding)
 
         # Stepper Driver Type Options (Dropdown Menu)
+        self.drivers = DRIVERS if drivers is None else drivers
         self.driver_types = tk.StringVar()
         self.driver_types.set("Select Type")
-        types_options = ["A4899", "DRV8825", "TMC2208", "TMC2209"]
+        types_options = list(self.drivers)
         dropdown_type = tk.OptionMenu(self, self.driver_types, *types_options, command=self.change_frame)
         dropdown_type.config(bg='#0F4C75', fg='white', font=('Arial', 12))
         dropdown_type.grid(row=1, column=0, sticky="nsew", padx=padding)
         self.driver_types.set(types_options[0])
 
-        # Frames for different drivers
-        self.frame_A4988 = A4988Frame(self)
-        self.frame_DRV8825 = DRV8825Frame(self)
-        self.frame_TMC2208 = TMC2208Frame(self)
-        self.frame_TMC2209 = TMC2209Frame(self)
-
-        # initialize with A4899
-        self.frame_A4988.grid(row=2, column=0, sticky="nsew", pady=padding, padx=padding)
-        self.frame_DRV8825.grid(row=2, column=0, sticky="nsew", pady=padding, padx=padding)
-        self.frame_TMC2208.grid(row=2, column=0, sticky="nsew", pady=padding, padx=padding)
-        self.frame_TMC2209.grid(row=2, column=0, sticky="nsew", pady=padding, padx=padding)
-        self.frame_DRV8825.grid_remove()
-        self.frame_TMC2208.grid_remove()
-        self.frame_TMC2209.grid_remove()
+        # Table with one row per axis, for whole machines and fleets
+        self.axis_table_window = None
+        button_axes = tk.Button(self, text="Multi-Axis Table", font=('Arial', 12), bg='#0F4C75', fg='white', command=self.open_axis_table)
+        button_axes.grid(row=3, column=0, sticky="nsew", padx=padding, pady=(0, padding))
+
+        # Frames for different drivers are built on first selection and kept in a
+        # least recently used cache, so startup cost does not grow with the number of drivers
+        self.max_cached_frames = max(1, max_cached_frames)
+        self.frames = OrderedDict()
+        self.current_frame = None
+
+        # initialize with first driver
+        self.change_frame()
+
+    def get_frame(self, driver_type):
+        frame = self.frames.get(driver_type)
+        if frame is not None:
+            self.frames.move_to_end(driver_type)
+            return frame
+
+        frame = DriverFrame(self, self.drivers[driver_type])
+        frame.grid(row=2, column=0, sticky="nsew", pady=padding, padx=padding)
+        frame.grid_remove()
+        self.frames[driver_type] = frame
+        return frame
+
+    def evict_frames(self):
+        # Destroy the least recently used frames, never the visible one
+        while len(self.frames) > self.max_cached_frames:
+            driver_type, frame = next(iter(self.frames.items()))
+            if frame is self.current_frame:
+                self.frames.move_to_end(driver_type)
+                continue
+            del self.frames[driver_type]
+            frame.destroy()
 
     def change_frame(self, *args):
         selected_type = self.driver_types.get()
-
-        # Hide all frames
-        self.frame_A4988.grid_remove()
-        self.frame_DRV8825.grid_remove()
-        self.frame_TMC2208.grid_remove()
-        self.frame_TMC2209.grid_remove()
-
-        # Show selected frame
-        if selected_type == "A4899":
-            self.frame_A4988.grid()
-        elif selected_type == "DRV8825":
-            self.frame_DRV8825.grid()
-        elif selected_type == "TMC2208":
-            self.frame_TMC2208.grid()
-        elif selected_type == "TMC2209":
-            self.frame_TMC2209.grid()
-
-class A4988Frame(tk.Frame):
-    def __init__(self, parent):
+        frame = self.get_frame(selected_type)
+
+        # Hide previous frame, show selected frame
+        if self.current_frame is not None and self.current_frame is not frame:
+            self.current_frame.grid_remove()
+        frame.grid()
+        self.current_frame = frame
+
+        self.evict_frames()
+
+    def open_axis_table(self):
+        # Only one table window, imported on first use to keep startup fast
+        if self.axis_table_window is not None and self.axis_table_window.winfo_exists():
+            self.axis_table_window.lift()
+            return
+        from axis_table import AxisTableWindow
+
+        self.axis_table_window = AxisTableWindow(self, padding)
+
+class DriverFrame(tk.Frame):
+    # Input sliders and Vref result for one driver, laid out from its DriverSpec.
+    # Slider events only mark the frame dirty, bursts of events are collapsed into one
+    # update per idle cycle, and widgets are only reconfigured when their text actually changes.
+    def __init__(self, parent, spec):
         super().__init__(parent)
         self.config(bg='#454545')
+        self.spec = spec
 
-        self.columnconfigure(0, weight=1)
-        self.columnconfigure(1, weight=3)
-        self.rowconfigure(3, weight=1)
+        self.pending_update = None
+        self.last_inputs = None
+        self.rendered = {} # (widget, option) -> last text set
 
-        # Labels for input boxes
-        label_current = tk.Label(self, text="Max Current per Phase:", font=('Arial', 12), bg='#454545', fg='white')
-        label_margin = tk.Label(self, text="Safety Margin:", font=('Arial', 12), bg='#454545', fg='white')
-        label_resistor = tk.Label(self, text="Resistor Value:", font=('Arial', 12), bg='#454545', fg='white')
-
-        self.scale_current = tk.Scale(self, from_=0, to=2000, resolution=100, orient="horizontal", font=('Arial', 10), label="mA", showvalue=False, command=self.update_slider_labels)
-        self.scale_margin = tk.Scale(self, from_=0, to=50, resolution=1, orient="horizontal", font=('Arial', 10), label="%", showvalue=False, command=self.update_slider_labels)
-        self.resistor_options = ["0.05 Ω", "0.1 Ω", "0.068 Ω"]
-        self.resistor_value = tk.StringVar()
-        self.resistor_value.set(self.resistor_options[0])
-        self.dropdown_resistor = tk.OptionMenu(self, self.resistor_value, *self.resistor_options, command=self.calculate_reference_voltage)
-        self.scale_current.set(1000)
-        self.scale_margin.set(20)
-
-        # Output of calculation result
-        self.result_frame = tk.Frame(self, bg='white', bd=2, relief=tk.GROOVE)
-        self.result_frame.columnconfigure(0, weight=8)
-        self.result_frame.columnconfigure(1, weight=4)
-        self.result_frame.columnconfigure(2, weight=2)
-        self.result_frame.rowconfigure(0, weight=1)
-        self.result_frame.rowconfigure(1, weight=3)
-        self.result_frame.rowconfigure(2, weight=1)
-        empty_label1 = tk.Label(self.result_frame, text="", bg='#454545')
-        empty_label2 = tk.Label(self.result_frame, text="", bg='#454545')
-        empty_label3 = tk.Label(self.result_frame, text="", bg='#454545')
-        empty_label1.grid(row=0, column=0, columnspan=3, sticky="ew")
-        empty_label2.grid(row=2, column=0, columnspan=3, sticky="ew")
-        empty_label3.grid(row=1, column=2, sticky="nsew")
-        self.label_result = tk.Label(self.result_frame, text="Reference Voltage:", font=('Arial', 12), bg='#454545', fg='white', padx=padding*2, pady=padding, anchor="w")
-        self.calculation_result = tk.Label(self.result_frame, text="", font=('Arial', 12), bg='white', fg='black', anchor="center")
-        self.label_result.grid(row=1, column=0, sticky="ew")
-        self.calculation_result.grid(row=1, column=1, sticky="ew")
-
-        # Grid placement
-        label_current.grid(row=0, column=0, padx=padding, pady=padding, sticky="w")
-        self.scale_current.grid(row=0, column=1, padx=padding, pady=padding, sticky="ew")
-        label_margin.grid(row=1, column=0, padx=padding, pady=padding, sticky="w")
-        self.scale_margin.grid(row=1, column=1, padx=padding, pady=padding, sticky="ew")
-        label_resistor.grid(row=2, column=0, padx=padding, pady=padding, sticky="w")
-        self.dropdown_resistor.grid(row=2, column=1, padx=padding, pady=padding, sticky="ew")
-        self.result_frame.grid(row=3, column=0, columnspan=2, padx=padding, pady=padding, sticky="sew")
-
-        self.update_slider_labels()
-
-        # Bind events to recalculate reference voltage
-        self.scale_current.bind(func=self.calculate_reference_voltage())
-        self.scale_margin.bind(func=self.calculate_reference_voltage())
-
-    def update_slider_labels(self, value=None):
-        # Append units to slider labels
-        current_value = self.scale_current.get()
-        self.scale_current.configure(label=f"{current_value} mA")
-
-        margin_value = self.scale_margin.get()
-        self.scale_margin.configure(label=f"{margin_value} %")
-
-        self.calculate_reference_voltage()
-
-    def calculate_reference_voltage(self, value=None):
-        max_current_mA = float(self.scale_current.get())
-        safety_margin = float(self.scale_margin.get())
-        resistor_value_str = self.resistor_value.get()
-        resistor_value_str = resistor_value_str.replace(" Ω", "")  # Strip the unit (Ω)
-        resistor_value = float(resistor_value_str)
-        max_current_A = max_current_mA / 1000 * (1 - safety_margin/100)  # Convert current from mA to A
-        # Calculation
-        reference_voltage = max_current_A * 8 * resistor_value
-        self.calculation_result.config(text=f"{reference_voltage:.2f} V")
-
-
-class DRV8825Frame(tk.Frame):
-    def __init__(self, parent):
-        super().__init__(parent)
-        self.config(bg='#454545')
+        # counters to compare slider events with the redraws they cause
+        self.events_handled = 0
+        self.redraws = 0
 
         self.columnconfigure(0, weight=1)
         self.columnconfigure(1, weight=3)
@@ -189,83 +244,21 @@ class DRV8825Frame(tk.Frame):
         # Labels for input boxes
         label_current = tk.Label(self, text="Max Current per Phase:", font=('Arial', 12), bg='#454545', fg='white')
         label_margin = tk.Label(self, text="Safety Margin:", font=('Arial', 12), bg='#454545', fg='white')
-        empty_label = tk.Label(self, text="", font=('Arial', 12), bg='#454545')
 
-        self.scale_current = tk.Scale(self, from_=0, to=2500, resolution=100, orient="horizontal", font=('Arial', 10), label="mA", showvalue=False, command=self.update_slider_labels)
-        self.scale_margin = tk.Scale(self, from_=0, to=50, resolution=1, orient="horizontal", font=('Arial', 10), label="%", showvalue=False, command=self.update_slider_labels)
+        self.scale_current = tk.Scale(self, from_=0, to=spec.max_current_mA, resolution=spec.current_step_mA, orient="horizontal", font=('Arial', 10), label="mA", showvalue=False, command=self.schedule_update)
+        self.scale_margin = tk.Scale(self, from_=0, to=50, resolution=1, orient="horizontal", font=('Arial', 10), label="%", showvalue=False, command=self.schedule_update)
         self.scale_current.set(1000)
         self.scale_margin.set(20)
 
-        # Output of calculation result
-        self.result_frame = tk.Frame(self, bg='white', bd=2, relief=tk.GROOVE)
-        self.result_frame.columnconfigure(0, weight=8)
-        self.result_frame.columnconfigure(1, weight=4)
-        self.result_frame.columnconfigure(2, weight=2)
-        self.result_frame.rowconfigure(0, weight=1)
-        self.result_frame.rowconfigure(1, weight=3)
-        self.result_frame.rowconfigure(2, weight=1)
-        empty_label1 = tk.Label(self.result_frame, text="", bg='#454545')
-        empty_label2 = tk.Label(self.result_frame, text="", bg='#454545')
-        empty_label3 = tk.Label(self.result_frame, text="", bg='#454545')
-        empty_label1.grid(row=0, column=0, columnspan=3, sticky="ew")
-        empty_label2.grid(row=2, column=0, columnspan=3, sticky="ew")
-        empty_label3.grid(row=1, column=2, sticky="nsew")
-        self.label_result = tk.Label(self.result_frame, text="Reference Voltage:", font=('Arial', 12), bg='#454545', fg='white', padx=padding*2, pady=padding, anchor="w")
-        self.calculation_result = tk.Label(self.result_frame, text="", font=('Arial', 12), bg='white', fg='black', anchor="center")
-        self.label_result.grid(row=1, column=0, sticky="ew")
-        self.calculation_result.grid(row=1, column=1, sticky="ew")
-
-        # Grid placement
-        label_current.grid(row=0, column=0, padx=padding, pady=padding, sticky="w")
-        self.scale_current.grid(row=0, column=1, padx=padding, pady=padding, sticky="ew")
-        label_margin.grid(row=1, column=0, padx=padding, pady=padding, sticky="w")
-        self.scale_margin.grid(row=1, column=1, padx=padding, pady=padding, sticky="ew")
-        empty_label.grid(row=2, column=0, padx=padding, pady=padding, columnspan=2)
-        self.result_frame.grid(row=3, column=0, columnspan=2, padx=padding, pady=padding, sticky="sew")
-
-        self.update_slider_labels()
-
-        # Bind events to recalculate reference voltage
-        self.scale_current.bind(func=self.calculate_reference_voltage())
-        self.scale_margin.bind(func=self.calculate_reference_voltage())
-
-    def update_slider_labels(self, value=None):
-        # Append units to slider labels
-        current_value = self.scale_current.get()
-        self.scale_current.configure(label=f"{current_value} mA")
-
-        margin_value = self.scale_margin.get()
-        self.scale_margin.configure(label=f"{margin_value} %")
-
-        self.calculate_reference_voltage()
-
-    def calculate_reference_voltage(self):
-        max_current_mA = float(self.scale_current.get())
-        safety_margin = float(self.scale_margin.get())
-        max_current_A = max_current_mA / 1000 * (1 - safety_margin/100)  # Convert current from mA to A
-        # Calculation
-        reference_voltage = max_current_A / 2
-        self.calculation_result.config(text=f"{reference_voltage:.2f} V")
-
-
-class TMC2208Frame(tk.Frame):
-    def __init__(self, parent):
-        super().__init__(parent)
-        self.config(bg='#454545')
-
-        self.columnconfigure(0, weight=1)
-        self.columnconfigure(1, weight=3)
-        self.rowconfigure(3, weight=1)
-
-        # Labels for input boxes
-        label_current = tk.Label(self, text="Max Current per Phase:", font=('Arial', 12), bg='#454545', fg='white')
-        label_margin = tk.Label(self, text="Safety Margin:", font=('Arial', 12), bg='#454545', fg='white')
-        empty_label = tk.Label(self, text="", font=('Arial', 12), bg='#454545')
-
-        self.scale_current = tk.Scale(self, from_=0, to=1200, resolution=100, orient="horizontal", font=('Arial', 10), label="mA", showvalue=False, command=self.update_slider_labels)
-        self.scale_margin = tk.Scale(self, from_=0, to=50, resolution=1, orient="horizontal", font=('Arial', 10), label="%", showvalue=False, command=self.update_slider_labels)
-        self.scale_current.set(1000)
-        self.scale_margin.set(20)
+        # Sense resistor options, only for drivers where the resistor enters the formula
+        self.resistor_options = {f"{resistor} Ω": resistor for resistor in spec.sense_resistors}
+        self.resistor_value = tk.StringVar()
+        if spec.uses_resistor:
+            label_resistor = tk.Label(self, text="Resistor Value:", font=('Arial', 12), bg='#454545', fg='white')
+            self.resistor_value.set(next(iter(self.resistor_options)))
+            self.dropdown_resistor = tk.OptionMenu(self, self.resistor_value, *self.resistor_options, command=self.schedule_update)
+        else:
+            empty_label = tk.Label(self, text="", font=('Arial', 12), bg='#454545')
 
         # Output of calculation result
         self.result_frame = tk.Frame(self, bg='white', bd=2, relief=tk.GROOVE)
@@ -285,111 +278,190 @@ class TMC2208Frame(tk.Frame):
         self.calculation_result = tk.Label(self.result_frame, text="", font=('Arial', 12), bg='white', fg='black', anchor="center")
         self.label_result.grid(row=1, column=0, sticky="ew")
         self.calculation_result.grid(row=1, column=1, sticky="ew")
+        self.tolerance_result = tk.Label(self.result_frame, text="", font=('Courier', 9), bg='white', fg='black', justify="left", anchor="w")
+
+        # Monte Carlo tolerance analysis, runs in a worker thread and streams into tolerance_result
+        self.tolerance_worker = None
+        self.tolerance_poll = None
+        self.tolerance_frame = tk.Frame(self, bg='#454545')
+        label_tolerance = tk.Label(self.tolerance_frame, text="Tolerance R / Meter [%]:", font=('Arial', 12), bg='#454545', fg='white')
+        self.spin_resistor_tolerance = tk.Spinbox(self.tolerance_frame, from_=0, to=10, increment=0.5, width=5, font=('Arial', 10))
+        self.spin_meter_tolerance = tk.Spinbox(self.tolerance_frame, from_=0, to=10, increment=0.5, width=5, font=('Arial', 10))
+        for spinbox in (self.spin_resistor_tolerance, self.spin_meter_tolerance):
+            spinbox.delete(0, "end")
+            spinbox.insert(0, "1.0")
+        button_tolerance = tk.Button(self.tolerance_frame, text="Tolerance Analysis", font=('Arial', 10), bg='#0F4C75', fg='white', command=self.start_tolerance_analysis)
+        label_tolerance.grid(row=0, column=0, padx=padding, sticky="w")
+        self.spin_resistor_tolerance.grid(row=0, column=1, padx=padding)
+        self.spin_meter_tolerance.grid(row=0, column=2, padx=padding)
+        button_tolerance.grid(row=0, column=3, padx=padding, sticky="e")
+        self.tolerance_frame.columnconfigure(3, weight=1)
 
         # Grid placement
         label_current.grid(row=0, column=0, padx=padding, pady=padding, sticky="w")
         self.scale_current.grid(row=0, column=1, padx=padding, pady=padding, sticky="ew")
         label_margin.grid(row=1, column=0, padx=padding, pady=padding, sticky="w")
         self.scale_margin.grid(row=1, column=1, padx=padding, pady=padding, sticky="ew")
-        empty_label.grid(row=2, column=0, padx=padding, pady=padding, columnspan=2)
+        if spec.uses_resistor:
+            label_resistor.grid(row=2, column=0, padx=padding, pady=padding, sticky="w")
+            self.dropdown_resistor.grid(row=2, column=1, padx=padding, pady=padding, sticky="ew")
+        else:
+            empty_label.grid(row=2, column=0, padx=padding, pady=padding, columnspan=2)
         self.result_frame.grid(row=3, column=0, columnspan=2, padx=padding, pady=padding, sticky="sew")
+        self.tolerance_frame.grid(row=4, column=0, columnspan=2, padx=padding, pady=padding, sticky="ew")
 
         self.update_slider_labels()
 
-        # Bind events to recalculate reference voltage
-        self.scale_current.bind(func=self.calculate_reference_voltage())
-        self.scale_margin.bind(func=self.calculate_reference_voltage())
+    def schedule_update(self, value=None):
+        self.events_handled += 1
+        if self.pending_update is None:
+            self.pending_update = self.after_idle(self.update_slider_labels)
 
     def update_slider_labels(self, value=None):
-        # Append units to slider labels
-        current_value = self.scale_current.get()
-        self.scale_current.configure(label=f"{current_value} mA")
-
-        margin_value = self.scale_margin.get()
-        self.scale_margin.configure(label=f"{margin_value} %")
+        self.pending_update = None
 
-        self.calculate_reference_voltage()
-
-    def calculate_reference_voltage(self):
-        max_current_mA = float(self.scale_current.get())
-        safety_margin = float(self.scale_margin.get())
-        max_current_A = max_current_mA / 1000 * (1 - safety_margin/100) # Convert current from mA to A and include safety margin
-        # Calculation
-        reference_voltage = max_current_A * 1.41
-        self.calculation_result.config(text=f"Reference Voltage: {reference_voltage:.2f} V")
-
-
-class TMC2209Frame(tk.Frame):
-    def __init__(self, parent):
-        super().__init__(parent)
-        self.config(bg='#454545')
-
-        self.columnconfigure(0, weight=1)
-        self.columnconfigure(1, weight=3)
-        self.rowconfigure(3, weight=1)
-
-        # Labels for input boxes
-        label_current = tk.Label(self, text="Max Current per Phase:", font=('Arial', 12), bg='#454545', fg='white')
-        label_margin = tk.Label(self, text="Safety Margin:", font=('Arial', 12), bg='#454545', fg='white')
-        empty_label = tk.Label(self, text="", font=('Arial', 12), bg='#454545')
-
-        self.scale_current = tk.Scale(self, from_=0, to=2000, resolution=100, orient="horizontal", font=('Arial', 10), label="mA", showvalue=False, command=self.update_slider_labels)
-        self.scale_margin = tk.Scale(self, from_=0, to=50, resolution=1, orient="horizontal", font=('Arial', 10), label="%", showvalue=False, command=self.update_slider_labels)
-        self.scale_current.set(1000)
-        self.scale_margin.set(20)
-
-        # Output of calculation result
-        self.result_frame = tk.Frame(self, bg='white', bd=2, relief=tk.GROOVE)
-        self.result_frame.columnconfigure(0, weight=8)
-        self.result_frame.columnconfigure(1, weight=4)
-        self.result_frame.columnconfigure(2, weight=2)
-        self.result_frame.rowconfigure(0, weight=1)
-        self.result_frame.rowconfigure(1, weight=3)
-        self.result_frame.rowconfigure(2, weight=1)
-        empty_label1 = tk.Label(self.result_frame, text="", bg='#454545')
-        empty_label2 = tk.Label(self.result_frame, text="", bg='#454545')
-        empty_label3 = tk.Label(self.result_frame, text="", bg='#454545')
-        empty_label1.grid(row=0, column=0, columnspan=3, sticky="ew")
-        empty_label2.grid(row=2, column=0, columnspan=3, sticky="ew")
-        empty_label3.grid(row=1, column=2, sticky="nsew")
-        self.label_result = tk.Label(self.result_frame, text="Reference Voltage:", font=('Arial', 12), bg='#454545', fg='white', padx=padding*2, pady=padding, anchor="w")
-        self.calculation_result = tk.Label(self.result_frame, text="", font=('Arial', 12), bg='white', fg='black', anchor="center")
-        self.label_result.grid(row=1, column=0, sticky="ew")
-        self.calculation_result.grid(row=1, column=1, sticky="ew")
-
-        # Grid placement
-        label_current.grid(row=0, column=0, padx=padding, pady=padding, sticky="w")
-        self.scale_current.grid(row=0, column=1, padx=padding, pady=padding, sticky="ew")
-        label_margin.grid(row=1, column=0, padx=padding, pady=padding, sticky="w")
-        self.scale_margin.grid(row=1, column=1, padx=padding, pady=padding, sticky="ew")
-        empty_label.grid(row=2, column=0, padx=padding, pady=padding, columnspan=2)
-        self.result_frame.grid(row=3, column=0, columnspan=2, padx=padding, pady=padding, sticky="sew")
-
-        self.update_slider_labels()
-
-        # Bind events to recalculate reference voltage
-        self.scale_current.bind(func=self.calculate_reference_voltage())
-        self.scale_margin.bind(func=self.calculate_reference_voltage())
-
-    def update_slider_labels(self, value=None):
         # Append units to slider labels
         current_value = self.scale_current.get()
-        self.scale_current.configure(label=f"{current_value} mA")
+        self.set_text(self.scale_current, "label", f"{current_value} mA")
 
         margin_value = self.scale_margin.get()
-        self.scale_margin.configure(label=f"{margin_value} %")
+        self.set_text(self.scale_margin, "label", f"{margin_value} %")
 
         self.calculate_reference_voltage()
 
-    def calculate_reference_voltage(self):
+    def calculate_reference_voltage(self, value=None):
         max_current_mA = float(self.scale_current.get())
         safety_margin = float(self.scale_margin.get())
-        max_current_A = max_current_mA / 1000 * (1 - safety_margin/100) # Convert current from mA to A and include safety margin
+        resistor_value = self.resistor_options.get(self.resistor_value.get())
+        if not self.inputs_changed(max_current_mA, safety_margin, resistor_value):
+            return
         # Calculation
-        reference_voltage = max_current_A * 1.41
-        self.calculation_result.config(text=f"Reference Voltage: {reference_voltage:.2f} V")
+        reference_voltage_V = reference_voltage(self.spec.name, max_current_mA, safety_margin, resistor_value)
+        self.set_text(self.calculation_result, "text", f"{reference_voltage_V:.2f} V")
+
+    def inputs_changed(self, *inputs):
+        # True if the calculation inputs differ from the last calculation
+        if inputs == self.last_inputs:
+            return False
+        self.last_inputs = inputs
+        return True
+
+    def set_text(self, widget, option, text):
+        # Skip the config call if the widget already shows this text
+        key = (str(widget), option)
+        if self.rendered.get(key) == text:
+            return
+        self.rendered[key] = text
+        widget.configure(**{option: text})
+        self.redraws += 1
+
+    def start_tolerance_analysis(self):
+        self.stop_tolerance_analysis()
+        try:
+            resistor_tolerance = float(self.spin_resistor_tolerance.get()) / 100
+            meter_tolerance = float(self.spin_meter_tolerance.get()) / 100
+        except ValueError:
+            self.show_tolerance_result("Invalid tolerance")
+            return
+
+        inputs = (self.spec.name, float(self.scale_current.get()), float(self.scale_margin.get()), resistor_tolerance, meter_tolerance)
+        self.tolerance_worker = ToleranceWorker(*inputs)
+        self.tolerance_worker.start()
+        self.show_tolerance_result("Running tolerance analysis...")
+        self.tolerance_poll = self.after(100, self.poll_tolerance_analysis)
+
+    def poll_tolerance_analysis(self):
+        # Show the latest partial result of the worker, the Tk widgets are only touched here
+        self.tolerance_poll = None
+        worker = self.tolerance_worker
+        if worker is None:
+            return
+        text = None
+        finished = False
+        while True:
+            try:
+                message = worker.results.get_nowait()
+            except queue.Empty:
+                break
+            if message is None:
+                finished = True
+            else:
+                text = message
+        if text is not None:
+            self.show_tolerance_result(text)
+        if finished:
+            self.tolerance_worker = None
+        else:
+            self.tolerance_poll = self.after(100, self.poll_tolerance_analysis)
+
+    def stop_tolerance_analysis(self):
+        if self.tolerance_poll is not None:
+            self.after_cancel(self.tolerance_poll)
+            self.tolerance_poll = None
+        if self.tolerance_worker is not None:
+            self.tolerance_worker.stop.set()
+            self.tolerance_worker = None
+
+    def show_tolerance_result(self, text):
+        if not self.tolerance_result.winfo_ismapped():
+            self.tolerance_result.grid(row=3, column=0, columnspan=3, padx=padding, pady=padding, sticky="ew")
+        self.set_text(self.tolerance_result, "text", text)
+
+    def destroy(self):
+        if self.pending_update is not None:
+            self.after_cancel(self.pending_update)
+            self.pending_update = None
+        self.stop_tolerance_analysis()
+        super().destroy()
+
+class ToleranceWorker(threading.Thread):
+    # Runs the Monte Carlo analysis off the Tk thread. Partial results are passed to the
+    # GUI as text through a queue, None marks the end.
+    def __init__(self, driver, max_current_mA, safety_margin, resistor_tolerance, meter_tolerance, samples=4_000_000):
+        super().__init__(daemon=True)
+        self.arguments = (driver, max_current_mA, safety_margin, resistor_tolerance, meter_tolerance, samples)
+        self.results = queue.Queue()
+        self.stop = threading.Event()
+
+    def run(self):
+        try:
+            # imported here, NumPy is only needed for the analysis
+            from montecarlo import simulate
+            for result in simulate(*self.arguments, batch_size=250_000):
+                if self.stop.is_set():
+                    break
+                self.results.put(result.text(rows=10))
+        except ImportError:
+            self.results.put("NumPy is required for the tolerance analysis")
+        except ValueError as error:
+            self.results.put(str(error))
+        finally:
+            self.results.put(None)
 
 ######################## Main code: ########################
 
-app = App()
-app.mainloop()
+def enable_tracing(path=None):
+    # Latency tracing of the GUI's hot callbacks, see tracing.py
+    if path is None:
+        tracing.enable_from_env()
+    else:
+        tracing.enable(path)
+    # App.run records the event loop itself, it calls dooneevent() instead of update()
+    tracing.instrument(MainMenu, "change_frame")
+    tracing.instrument(DriverFrame, "update_slider_labels", "calculate_reference_voltage")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stepper-Driver Current Calculator")
+    parser.add_argument("--trace", nargs="?", const=tracing.DEFAULT_REPORT, metavar="REPORT",
+                        help=f"record handler latencies and write them to REPORT on exit (default {tracing.DEFAULT_REPORT}), also enabled by {tracing.TRACE_ENV}")
+    args = parser.parse_args(argv)
+    enable_tracing(args.trace)
+
+    # Probe the display before enabling DPI awareness, see probe_windows_display()
+    display = probe_windows_display()
+    set_dpi_awareness()
+    app = App(display)
+    app.run()
+
+if __name__ == "__main__":
+    main()
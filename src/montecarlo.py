@@ -0,0 +1,153 @@
+# Monte Carlo tolerance analysis of the phase current.
+# The Vref formulas treat the sense resistor and the measured Vref as exact. In production the
+# trimpot is set to the calculated Vref as read by a multimeter with some error, and the sense
+# resistor deviates from its nominal value. Both scale the real phase current:
+#   I_real = I_set / ((1 + meter_error) * (1 + resistor_error))
+# Samples are drawn in large vectorized batches, and after every batch the accumulated
+# statistics are yielded, so callers can show results while they converge.
+#
+# usage: python montecarlo.py DRIVER MAX_CURRENT_mA [--margin 20] [--resistor OHM]
+#                             [--resistor-tolerance 1] [--meter-tolerance 1] [--samples 10000000]
+
+import argparse
+import sys
+
+import numpy as np
+
+from drivers import DRIVERS
+from vref import effective_current, reference_voltage
+
+DISTRIBUTIONS = ("uniform", "normal")
+
+
+class ToleranceResult:
+    # Accumulated statistics of the real phase current in mA
+    def __init__(self, bin_edges, rating_mA):
+        self.bin_edges = bin_edges
+        self.counts = np.zeros(len(bin_edges) - 1, dtype=np.int64)
+        self.rating_mA = rating_mA
+        self.samples = 0
+        self.total = 0.0
+        self.total_squares = 0.0
+        self.exceeding = 0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    def add(self, currents):
+        # Values outside the histogram range are counted in the outermost bins
+        clipped = np.clip(currents, self.bin_edges[0], self.bin_edges[-1])
+        self.counts += np.histogram(clipped, bins=self.bin_edges)[0]
+        self.samples += currents.size
+        self.total += float(currents.sum())
+        self.total_squares += float(np.square(currents).sum())
+        self.exceeding += int(np.count_nonzero(currents > self.rating_mA))
+        self.minimum = min(self.minimum, float(currents.min()))
+        self.maximum = max(self.maximum, float(currents.max()))
+
+    @property
+    def mean(self):
+        return self.total / self.samples
+
+    @property
+    def std(self):
+        return max(0.0, self.total_squares / self.samples - self.mean ** 2) ** 0.5
+
+    @property
+    def exceed_probability(self):
+        return self.exceeding / self.samples
+
+    def text(self, width=30, rows=12):
+        """Short text report with a bar histogram, merged down to `rows` lines."""
+        lines = [
+            f"{self.samples:,} samples",
+            f"mean {self.mean:.1f} mA, std {self.std:.1f} mA",
+            f"range {self.minimum:.1f} - {self.maximum:.1f} mA",
+            f"P(I > {self.rating_mA:.0f} mA) = {self.exceed_probability * 100:.2f} %",
+        ]
+        groups = np.array_split(np.arange(len(self.counts)), rows)
+        merged = [self.counts[group].sum() for group in groups]
+        peak = max(merged) or 1
+        for group, count in zip(groups, merged):
+            low = self.bin_edges[group[0]]
+            high = self.bin_edges[group[-1] + 1]
+            lines.append(f"{low:7.1f}-{high:7.1f} {'#' * int(round(width * count / peak))}")
+        return "\n".join(lines)
+
+
+def draw_errors(rng, tolerance, size, distribution):
+    # Relative errors; for the normal distribution the tolerance is taken as 3 sigma
+    if distribution == "normal":
+        return rng.normal(0.0, tolerance / 3, size)
+    return rng.uniform(-tolerance, tolerance, size)
+
+
+def simulate(driver, max_current_mA, safety_margin, resistor_tolerance=0.01, meter_tolerance=0.01,
+             samples=10_000_000, batch_size=1_000_000, distribution="uniform", rating_mA=None, bins=120, seed=None):
+    """Yields a ToleranceResult after every batch of samples (the same object, updated).
+
+    Tolerances are relative (0.01 = 1 %), so the result does not depend on the nominal
+    sense resistor. rating_mA defaults to max_current_mA, the motor rating entered in the GUI.
+    """
+    if driver not in DRIVERS:
+        raise ValueError(f"Unknown driver type: {driver!r}")
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution: {distribution!r}")
+    # A tolerance of 100 % or more allows a zero or negative resistor or reading
+    for name, tolerance in (("resistor", resistor_tolerance), ("meter", meter_tolerance)):
+        if not 0 <= tolerance < 1:
+            raise ValueError(f"{name} tolerance must be at least 0 % and below 100 %, got {tolerance * 100:g} %")
+    if samples <= 0 or batch_size <= 0:
+        raise ValueError("samples and batch_size must be positive")
+
+    set_current_mA = effective_current(max_current_mA, safety_margin) * 1000
+    if rating_mA is None:
+        rating_mA = max_current_mA
+
+    # Histogram range covering the worst case of both tolerances (3 sigma for normal)
+    spread = 1.0 if distribution == "uniform" else 4 / 3
+    low = set_current_mA / ((1 + spread * meter_tolerance) * (1 + spread * resistor_tolerance))
+    high = set_current_mA / max(1e-9, (1 - spread * meter_tolerance) * (1 - spread * resistor_tolerance))
+    if high <= low:
+        high = low + 1.0
+    result = ToleranceResult(np.linspace(low, high, bins + 1), rating_mA)
+
+    rng = np.random.default_rng(seed)
+    remaining = samples
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        meter_error = draw_errors(rng, meter_tolerance, size, distribution)
+        resistor_error = draw_errors(rng, resistor_tolerance, size, distribution)
+        result.add(set_current_mA / ((1 + meter_error) * (1 + resistor_error)))
+        remaining -= size
+        yield result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo analysis of the real phase current under component and meter tolerances")
+    parser.add_argument("driver", choices=list(DRIVERS))
+    parser.add_argument("max_current", type=float, help="max current per phase (motor rating) in mA")
+    parser.add_argument("--margin", type=float, default=20, help="safety margin in %% (default 20)")
+    parser.add_argument("--resistor", type=float, help="sense resistor in Ohm, only used for the printed Vref")
+    parser.add_argument("--resistor-tolerance", type=float, default=1, help="sense resistor tolerance in %% (default 1)")
+    parser.add_argument("--meter-tolerance", type=float, default=1, help="multimeter error in %% of reading (default 1)")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--samples", type=int, default=10_000_000)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    try:
+        results = simulate(args.driver, args.max_current, args.margin, args.resistor_tolerance / 100, args.meter_tolerance / 100,
+                           args.samples, distribution=args.distribution, seed=args.seed)
+        result = next(results)
+    except ValueError as error:
+        parser.error(str(error))
+    vref = reference_voltage(args.driver, args.max_current, args.margin, args.resistor)
+    print(f"Set Vref to {vref:.3f} V")
+    for result in results:
+        pass
+    print(result.text())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
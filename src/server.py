@@ -0,0 +1,183 @@
+# Local HTTP/JSON service for Vref values, for tablets and bench stations without the GUI.
+# Built on asyncio streams with HTTP/1.1 keep-alive, uses the same formulas as the GUI
+# (vref.reference_voltage) behind an LRU cache.
+#
+#   GET  /drivers   supported drivers with current limits and resistor options
+#   POST /vref      {"driver": "A4988", "max_current_mA": 1000, "safety_margin": 20, "resistor": 0.068}
+#                   -> {"vref_V": 0.4352}
+#                   a JSON list of such objects is answered with a list of results (batch),
+#                   invalid entries get {"error": "..."} instead
+#
+# usage: python server.py [--host 127.0.0.1] [--port 8080]
+
+import argparse
+import asyncio
+import json
+import sys
+from functools import lru_cache
+from http import HTTPStatus
+
+from drivers import DRIVERS
+from vref import parse_query, reference_voltage
+
+MAX_BODY_BYTES = 1 << 20
+MAX_BATCH = 10000
+KEEP_ALIVE_TIMEOUT = 30
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+@lru_cache(maxsize=8192)
+def cached_vref(driver, max_current_mA, safety_margin, resistor):
+    return reference_voltage(driver, max_current_mA, safety_margin, resistor)
+
+
+def calculate(query):
+    if not isinstance(query, dict):
+        raise ValueError("expected an object with driver, max_current_mA and safety_margin")
+    try:
+        values = parse_query(query["driver"], query["max_current_mA"], query["safety_margin"], query.get("resistor"))
+    except KeyError as error:
+        raise ValueError(f"missing field {error}") from None
+    return {"vref_V": cached_vref(*values)}
+
+
+def handle_vref(body):
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "invalid JSON") from None
+
+    if isinstance(payload, list):
+        if len(payload) > MAX_BATCH:
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"at most {MAX_BATCH} queries per batch")
+        results = []
+        for query in payload:
+            try:
+                results.append(calculate(query))
+            except ValueError as error:
+                results.append({"error": str(error)})
+        return results
+    try:
+        return calculate(payload)
+    except ValueError as error:
+        raise RequestError(HTTPStatus.BAD_REQUEST, str(error)) from None
+
+
+def handle_drivers():
+    return [{"driver": spec.name, "max_current_mA": spec.max_current_mA, "current_step_mA": spec.current_step_mA,
+             "sense_resistors": list(spec.sense_resistors)} for spec in DRIVERS.values()]
+
+
+def dispatch(method, path, body):
+    path = path.split("?", 1)[0]
+    if path == "/vref":
+        if method != "POST":
+            raise RequestError(HTTPStatus.METHOD_NOT_ALLOWED, "use POST")
+        return handle_vref(body)
+    if path == "/drivers":
+        if method != "GET":
+            raise RequestError(HTTPStatus.METHOD_NOT_ALLOWED, "use GET")
+        return handle_drivers()
+    raise RequestError(HTTPStatus.NOT_FOUND, f"no such endpoint: {path}")
+
+
+def response(status, payload, keep_alive):
+    body = json.dumps(payload).encode()
+    head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + body
+
+
+async def read_request(reader):
+    # Returns (method, path, version, headers, body), or None when the client closed the connection
+    try:
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+        return None
+    except asyncio.LimitOverrunError:
+        raise RequestError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "header too large") from None
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, path, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "malformed request line") from None
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "invalid Content-Length") from None
+    if length < 0:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "body too large")
+    try:
+        body = await asyncio.wait_for(reader.readexactly(length), KEEP_ALIVE_TIMEOUT) if length else b""
+    except asyncio.TimeoutError:
+        return None
+    return method, path, version, headers, body
+
+
+async def handle_connection(reader, writer):
+    try:
+        while True:
+            try:
+                request = await read_request(reader)
+            except RequestError as error:
+                writer.write(response(error.status, {"error": str(error)}, False))
+                await writer.drain()
+                break
+            if request is None:
+                break
+            method, path, version, headers, body = request
+
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+            try:
+                status, payload = HTTPStatus.OK, dispatch(method, path, body)
+            except RequestError as error:
+                status, payload = error.status, {"error": str(error)}
+            writer.write(response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host="127.0.0.1", port=8080):
+    server = await asyncio.start_server(handle_connection, host, port)
+    addresses = ", ".join(f"{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in server.sockets)
+    print(f"Serving Vref on {addresses}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON service for stepper driver Vref values")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="port to listen on (default 8080)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
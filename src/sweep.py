@@ -0,0 +1,179 @@
+# Design-space sweep over every driver x sense resistor x current x safety margin.
+# For each configuration it computes Vref, the sense resistor power and an estimate of the
+# driver's heat. For a target motor current, the configurations within a tolerance of the
+# target are ranked by Pareto optimality in total power and safety margin.
+# The grid is split into chunks that are evaluated in a process pool; each worker reduces
+# its chunk to a local Pareto front, so only small results travel between processes.
+#
+# Power model, with the effective (margin reduced) phase current I:
+#   sense_power_W = I^2 * R_sense           peak power in one sense resistor
+#   driver_heat_W = I^2 * rds_on            both coils with sine currents (I_rms = I/sqrt(2)),
+#                                           high + low side MOSFET of each bridge conducting
+#
+# usage: python sweep.py TARGET_mA [--tolerance mA] [--step mA] [--workers N]
+
+import argparse
+import math
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from drivers import DRIVERS
+from vref import effective_current, reference_voltage
+
+SweepResult = namedtuple("SweepResult", ("driver", "resistor", "max_current_mA", "safety_margin", "vref_V",
+                                         "effective_current_mA", "sense_power_W", "driver_heat_W"))
+
+# One task is a slice of the current axis for one driver and resistor:
+# (driver, resistor, first current index, stop current index, current step, max margin, margin step)
+SweepTask = namedtuple("SweepTask", ("driver", "resistor", "start", "stop", "current_step_mA", "max_margin", "margin_step"))
+
+
+def grid_count(limit, step):
+    # Number of grid points 0, step, 2 * step, ... that do not exceed limit
+    return int(limit / step + 1e-9) + 1
+
+
+def current_range(task, target_mA, tolerance_mA, factor):
+    # Current indices of the task whose effective current (max current * factor) can be near the target
+    if factor <= 0:
+        return range(task.start, task.stop) if target_mA <= tolerance_mA else range(0)
+    low = math.ceil((target_mA - tolerance_mA) / factor / task.current_step_mA - 1e-9)
+    high = math.floor((target_mA + tolerance_mA) / factor / task.current_step_mA + 1e-9) + 1
+    return range(max(task.start, low), min(task.stop, high))
+
+
+def evaluate(task, target_mA=None, tolerance_mA=None):
+    """Configurations of one sweep task, only those near target_mA if it is given.
+
+    The current indices near the target are computed per margin, so the cost depends on
+    the number of matching configurations instead of the size of the grid.
+    """
+    spec = DRIVERS[task.driver]
+    resistor = task.resistor
+    resistor_ohm = resistor or 0.0
+    rds_on = spec.rds_on_ohm or 0.0
+    results = []
+    for margin_index in range(grid_count(task.max_margin, task.margin_step)):
+        safety_margin = margin_index * task.margin_step
+        if target_mA is None:
+            current_indices = range(task.start, task.stop)
+        else:
+            current_indices = current_range(task, target_mA, tolerance_mA, effective_current(1000, safety_margin))
+        for current_index in current_indices:
+            max_current_mA = current_index * task.current_step_mA
+            current_A = effective_current(max_current_mA, safety_margin)
+            results.append(SweepResult(
+                task.driver, resistor, max_current_mA, safety_margin,
+                reference_voltage(task.driver, max_current_mA, safety_margin, resistor),
+                current_A * 1000,
+                current_A * current_A * resistor_ohm,
+                current_A * current_A * rds_on,
+            ))
+    return results
+
+
+def total_power(result, current_mA=None):
+    """Driver heat plus sense resistor power, at current_mA if given instead of the result's own current.
+
+    Both sense resistors carry sine currents, together they dissipate sense_power_W on average.
+    """
+    if current_mA is None:
+        return result.driver_heat_W + result.sense_power_W
+    current_A = current_mA / 1000
+    return current_A * current_A * ((result.resistor or 0.0) + (DRIVERS[result.driver].rds_on_ohm or 0.0))
+
+
+def pareto(results, target_mA):
+    """Pareto-optimal results: small power at the target current and large safety margin, sorted by power.
+
+    Power is compared at target_mA, so a result is not preferred just for landing at the
+    low end of the tolerance band. Ties are broken by the smaller deviation from the target.
+    """
+    # Sorted by power, a result is on the front if it has a larger margin than every
+    # result before it
+    front = []
+    best_margin = None
+    key = lambda result: (round(total_power(result, target_mA), 12), -result.safety_margin, abs(result.effective_current_mA - target_mA))
+    for result in sorted(results, key=key):
+        if best_margin is None or result.safety_margin > best_margin:
+            front.append(result)
+            best_margin = result.safety_margin
+    return front
+
+
+def near_target(results, target_mA, tolerance_mA):
+    return [result for result in results if abs(result.effective_current_mA - target_mA) <= tolerance_mA]
+
+
+def evaluate_front(task, target_mA, tolerance_mA):
+    # Worker side reduction: only configurations near the target, and only their Pareto front
+    return pareto(near_target(evaluate(task, target_mA, tolerance_mA), target_mA, tolerance_mA), target_mA)
+
+
+def tasks(current_step_mA=100, max_margin=50, margin_step=1, chunk_currents=64):
+    """Sweep tasks covering every driver, resistor option and current up to the driver's limit."""
+    for spec in DRIVERS.values():
+        resistors = spec.resistor_options or (None,)
+        current_count = grid_count(spec.max_current_mA, current_step_mA)
+        for resistor in resistors:
+            for start in range(0, current_count, chunk_currents):
+                yield SweepTask(spec.name, resistor, start, min(start + chunk_currents, current_count), current_step_mA, max_margin, margin_step)
+
+
+def chunk_size_for(current_step_mA, workers):
+    # About 8 tasks per worker and driver/resistor combination keeps all cores busy
+    # without making the tasks so small that process overhead dominates
+    current_count = max(spec.max_current_mA for spec in DRIVERS.values()) / current_step_mA
+    return max(16, int(current_count / (8 * workers)))
+
+
+def pareto_front(target_mA, tolerance_mA=10, current_step_mA=10, max_margin=50, margin_step=1, workers=None):
+    """Pareto-optimal configurations whose effective current is within tolerance_mA of target_mA.
+
+    The objectives are total power at the target current (driver heat and sense resistors)
+    and safety margin. Sorted by total power. Steps finer than the GUI's 100 mA are allowed.
+    """
+    if current_step_mA <= 0 or margin_step <= 0:
+        raise ValueError("current and margin steps must be positive")
+    if tolerance_mA < 0:
+        raise ValueError("tolerance must not be negative")
+    workers = workers or os.cpu_count() or 1
+    task_list = list(tasks(current_step_mA, max_margin, margin_step, chunk_size_for(current_step_mA, workers)))
+    if workers == 1:
+        fronts = [evaluate_front(task, target_mA, tolerance_mA) for task in task_list]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            fronts = list(pool.map(evaluate_front, task_list, [target_mA] * len(task_list), [tolerance_mA] * len(task_list)))
+    return pareto([result for front in fronts for result in front], target_mA)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pareto-optimal driver configurations for a target motor current")
+    parser.add_argument("target", type=float, help="target phase current in mA")
+    parser.add_argument("--tolerance", type=float, default=10, help="allowed deviation from the target in mA (default 10)")
+    parser.add_argument("--step", type=float, default=10, help="current step of the sweep in mA (default 10)")
+    parser.add_argument("--margin-step", type=float, default=1, help="safety margin step in %% (default 1)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        front = pareto_front(args.target, args.tolerance, args.step, margin_step=args.margin_step, workers=args.workers)
+    except ValueError as error:
+        parser.error(str(error))
+    elapsed = time.perf_counter() - start
+
+    print(f"{'driver':8} {'R [Ohm]':>8} {'set [mA]':>9} {'margin':>7} {'Vref [V]':>9} {'I [mA]':>8} {'P_sense [W]':>12} {'P_driver [W]':>13}")
+    for result in front:
+        resistor = "-" if result.resistor is None else f"{result.resistor:g}"
+        print(f"{result.driver:8} {resistor:>8} {result.max_current_mA:9.0f} {result.safety_margin:6.0f}% {result.vref_V:9.3f} "
+              f"{result.effective_current_mA:8.1f} {result.sense_power_W:12.3f} {result.driver_heat_W:13.3f}")
+    print(f"{len(front)} Pareto-optimal configurations in {elapsed:.2f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
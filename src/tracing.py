@@ -0,0 +1,150 @@
+# Opt-in latency tracing for the GUI's event handlers.
+# Enabled with the STEPPER_TRACE environment variable (set to a report path, or 1 for the
+# default path) or main.py --trace. instrument() then wraps the given methods so every call
+# records its wall time into a fixed size ring buffer. On exit, percentiles, a histogram and
+# the slowest call stacks of every handler are written to a JSON report.
+# When tracing is off nothing is wrapped, so there is no overhead at all.
+
+import atexit
+import functools
+import heapq
+import json
+import math
+import os
+import time
+import traceback
+from array import array
+
+TRACE_ENV = "STEPPER_TRACE"
+DEFAULT_REPORT = "stepper_trace.json"
+
+# Upper bucket edges of the histogram in ms, the last bucket is open
+HISTOGRAM_EDGES_MS = (0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class RingBuffer:
+    # Keeps the last `size` samples in a preallocated array
+    __slots__ = ("values", "size", "index", "count")
+
+    def __init__(self, size):
+        self.values = array('d', bytes(8 * size))
+        self.size = size
+        self.index = 0
+        self.count = 0
+
+    def append(self, value):
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.size
+        self.count += 1
+
+    def samples(self):
+        if self.count < self.size:
+            return self.values[:self.count]
+        return self.values[self.index:] + self.values[:self.index]
+
+
+def percentile(sorted_samples, fraction):
+    # nearest-rank percentile
+    return sorted_samples[max(0, math.ceil(fraction * len(sorted_samples)) - 1)]
+
+
+def histogram(samples_ms):
+    counts = [0] * (len(HISTOGRAM_EDGES_MS) + 1)
+    for sample in samples_ms:
+        for i, edge in enumerate(HISTOGRAM_EDGES_MS):
+            if sample <= edge:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    labels = [f"<={edge} ms" for edge in HISTOGRAM_EDGES_MS] + [f">{HISTOGRAM_EDGES_MS[-1]} ms"]
+    return {label: count for label, count in zip(labels, counts) if count}
+
+
+class Tracer:
+    def __init__(self, path=DEFAULT_REPORT, buffer_size=4096, slowest=10):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.buffers = {}
+        self.slowest_count = slowest
+        self.slowest = [] # min-heap of (seconds, sequence number, name, stack)
+        self.sequence = 0
+
+    def buffer(self, name):
+        if name not in self.buffers:
+            self.buffers[name] = RingBuffer(self.buffer_size)
+        return self.buffers[name]
+
+    def record(self, name, seconds, buffer=None):
+        (buffer or self.buffer(name)).append(seconds)
+        # Only calls slower than the current top list pay for capturing the stack
+        if len(self.slowest) < self.slowest_count or seconds > self.slowest[0][0]:
+            self.sequence += 1
+            entry = (seconds, self.sequence, name, traceback.format_stack()[:-1])
+            if len(self.slowest) < self.slowest_count:
+                heapq.heappush(self.slowest, entry)
+            else:
+                heapq.heapreplace(self.slowest, entry)
+
+    def wrap(self, name, func):
+        buffer = self.buffer(name)
+
+        @functools.wraps(func)
+        def traced(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - start, buffer)
+        traced.__wrapped_by_tracer__ = True
+        return traced
+
+    def report(self):
+        handlers = {}
+        for name, buffer in self.buffers.items():
+            if not buffer.count:
+                continue
+            samples_ms = sorted(sample * 1000 for sample in buffer.samples())
+            handlers[name] = {
+                "calls": buffer.count,
+                "samples": len(samples_ms),
+                "p50_ms": percentile(samples_ms, 0.50),
+                "p95_ms": percentile(samples_ms, 0.95),
+                "p99_ms": percentile(samples_ms, 0.99),
+                "max_ms": samples_ms[-1],
+                "histogram": histogram(samples_ms),
+            }
+        slowest = [{"handler": name, "ms": seconds * 1000, "stack": "".join(stack)}
+                   for seconds, _, name, stack in sorted(self.slowest, reverse=True)]
+        return {"handlers": handlers, "slowest": slowest}
+
+    def dump(self):
+        with open(self.path, "w") as file:
+            json.dump(self.report(), file, indent=2)
+
+
+# The active tracer, None while tracing is off
+tracer = None
+
+def enable(path=None):
+    global tracer
+    if tracer is None:
+        tracer = Tracer(path or DEFAULT_REPORT)
+        atexit.register(tracer.dump)
+    return tracer
+
+def enable_from_env():
+    value = os.environ.get(TRACE_ENV)
+    if value:
+        enable(None if value == "1" else value)
+    return tracer
+
+def instrument(cls, *names):
+    # Wraps the methods of cls with timing if tracing is enabled
+    if tracer is None:
+        return
+    for name in names:
+        method = getattr(cls, name)
+        if getattr(method, "__wrapped_by_tracer__", False):
+            continue
+        setattr(cls, name, tracer.wrap(f"{cls.__name__}.{name}", method))
@@ -0,0 +1,114 @@
+# Reference voltage (Vref) calculation for the supported stepper drivers.
+# This module has no GUI dependencies so it can be used headless, e.g. for batch
+# calibration of whole machine fleets. The Tk frames in main.py call into it as well,
+# so GUI and batch results always agree.
+#
+# All drivers share the same linear form, see DriverSpec in drivers.py:
+#   Vref = max_current[A] * (1 - safety_margin[%]/100) * gain * sense_resistor[Ohm]
+# Drivers without a selectable sense resistor use a resistor factor of 1.
+
+import math
+
+from drivers import DRIVERS
+
+# Driver codes used by the batch functions are indices into this tuple
+DRIVER_NAMES = tuple(DRIVERS)
+
+
+def effective_current(max_current_mA, safety_margin):
+    # Convert current from mA to A and include safety margin
+    return max_current_mA / 1000 * (1 - safety_margin/100)
+
+
+def parse_query(driver, max_current_mA, safety_margin, resistor=None):
+    """Checked (driver, max_current_mA, safety_margin, resistor) from user input.
+
+    Numbers may be strings, a resistor of None or "" means the driver's default. Raises
+    ValueError for unknown drivers, values that are not finite numbers, negative currents,
+    resistors that are not positive and margins outside 0-100 %.
+    """
+    if not isinstance(driver, str) or driver not in DRIVERS:
+        raise ValueError(f"Unknown driver type: {driver!r}")
+    try:
+        max_current_mA = float(max_current_mA)
+        safety_margin = float(safety_margin)
+        resistor = None if resistor in (None, "") else float(resistor)
+    except TypeError as error:
+        raise ValueError(str(error)) from None
+    # NaN and infinity would also produce output that is not valid JSON
+    if not all(math.isfinite(value) for value in (max_current_mA, safety_margin, resistor) if value is not None):
+        raise ValueError("max_current_mA, safety_margin and resistor must be finite numbers")
+    if max_current_mA < 0:
+        raise ValueError(f"max_current_mA must not be negative: {max_current_mA:g}")
+    if not 0 <= safety_margin <= 100:
+        raise ValueError(f"safety_margin must be between 0 and 100 %: {safety_margin:g}")
+    if resistor is not None and resistor <= 0:
+        raise ValueError(f"resistor must be positive: {resistor:g}")
+    return driver, max_current_mA, safety_margin, resistor
+
+
+def reference_voltage(driver, max_current_mA, safety_margin, resistor=None):
+    """Vref in volts for a single configuration."""
+    spec = DRIVERS.get(driver)
+    if spec is None:
+        raise ValueError(f"Unknown driver type: {driver!r}")
+    reference_voltage = effective_current(max_current_mA, safety_margin) * spec.vref_gain
+    if spec.uses_resistor:
+        if resistor is None:
+            resistor = spec.sense_resistors[0]
+        reference_voltage = reference_voltage * resistor
+    return reference_voltage
+
+
+def driver_codes(drivers):
+    """Map driver names to integer codes (indices into DRIVER_NAMES).
+
+    Integer arrays are passed through unchanged, so callers that already keep
+    their drivers as codes skip the string lookup entirely.
+    """
+    import numpy as np
+
+    drivers = np.asarray(drivers)
+    if drivers.dtype.kind in "iu":
+        if drivers.size and (drivers.min() < 0 or drivers.max() >= len(DRIVER_NAMES)):
+            raise ValueError("Driver code out of range")
+        return drivers
+    # Only the distinct names have to be looked up
+    names, inverse = np.unique(drivers, return_inverse=True)
+    lookup = {name: code for code, name in enumerate(DRIVER_NAMES)}
+    unknown = [str(name) for name in names if str(name) not in lookup]
+    if unknown:
+        raise ValueError(f"Unknown driver type(s): {', '.join(unknown)}")
+    name_codes = np.array([lookup[str(name)] for name in names], dtype=np.intp)
+    return name_codes[inverse].reshape(drivers.shape)
+
+
+def reference_voltage_batch(drivers, max_current_mA, safety_margin, resistor=None):
+    """Vectorized Vref for arrays of configurations.
+
+    drivers may be driver names or integer codes, the other arguments are array-like
+    or scalars and are broadcast against each other. resistor is ignored for drivers
+    without a sense resistor option; missing values (None or NaN) use the driver's
+    default resistor. Returns a float64 numpy array.
+    """
+    import numpy as np
+
+    codes = driver_codes(drivers)
+    specs = [DRIVERS[name] for name in DRIVER_NAMES]
+    gain = np.array([spec.vref_gain for spec in specs])
+    default_resistor = np.array([spec.sense_resistors[0] if spec.uses_resistor else np.nan for spec in specs])
+    uses_resistor = ~np.isnan(default_resistor)
+
+    current = np.asarray(max_current_mA, dtype=np.float64)
+    margin = np.asarray(safety_margin, dtype=np.float64)
+    reference_voltage = effective_current(current, margin) * gain[codes]
+
+    if uses_resistor.any():
+        if resistor is None:
+            resistor_factor = default_resistor[codes]
+        else:
+            resistor = np.asarray(resistor, dtype=np.float64)
+            resistor_factor = np.where(np.isnan(resistor), default_resistor[codes], resistor)
+        resistor_factor = np.where(uses_resistor[codes], resistor_factor, 1.0)
+        reference_voltage = reference_voltage * resistor_factor
+    return reference_voltage
@@ -0,0 +1,229 @@
+# Precomputed Vref lookup tables.
+# The inputs of the frames are discrete (current in steps of the driver's slider, margin in
+# 1 % steps and a few sense resistor options), so every possible result can be computed once and stored in
+# flat arrays. Forward queries are an index calculation, inverse queries ("which current does
+# this measured Vref correspond to?") use a sorted index and bisection.
+#
+# usage: python vref_table.py DRIVER VREF [--resistor OHM] [--cache FILE]
+
+import argparse
+import math
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+from drivers import DRIVERS
+from vref import DRIVER_NAMES, reference_voltage
+
+CACHE_MAGIC = b"VREFTBL1"
+
+
+class VrefTable:
+    # Vref for every (current, margin) grid point of one driver and sense resistor.
+    # values is row-major: values[current_index * margin_count + margin_index]
+    def __init__(self, driver, resistor=None, max_current_mA=None, current_step_mA=None, max_margin=50, margin_step=1, values=None, order=None):
+        # The current grid defaults to the slider range of the driver
+        spec = DRIVERS[driver]
+        if max_current_mA is None:
+            max_current_mA = spec.max_current_mA
+        if current_step_mA is None:
+            current_step_mA = spec.current_step_mA
+
+        self.driver = driver
+        self.resistor = resistor
+        self.max_current_mA = max_current_mA
+        self.current_step_mA = current_step_mA
+        self.max_margin = max_margin
+        self.margin_step = margin_step
+        # Grid points up to and including the limits, never beyond them
+        self.current_count = int(max_current_mA / current_step_mA + 1e-9) + 1
+        self.margin_count = int(max_margin / margin_step + 1e-9) + 1
+
+        if values is None:
+            values = array('d', (reference_voltage(driver, current_index * current_step_mA, margin_index * margin_step, resistor)
+                                 for current_index in range(self.current_count)
+                                 for margin_index in range(self.margin_count)))
+        if order is None:
+            order = array('I', sorted(range(len(values)), key=values.__getitem__))
+        self.values = values
+        self.order = order # flat indices sorted by Vref
+        self.sorted_values = array('d', (values[index] for index in order))
+
+    @property
+    def key(self):
+        return table_key(self.driver, self.resistor)
+
+    def grid_index(self, value, step, count, name):
+        index = int(round(value / step))
+        if not 0 <= index < count or not math.isclose(index * step, value, abs_tol=1e-9):
+            raise ValueError(f"{name} {value} is not on the table grid")
+        return index
+
+    def settings(self, flat_index):
+        # (max current in mA, safety margin in %) of a flat index
+        current_index, margin_index = divmod(flat_index, self.margin_count)
+        return current_index * self.current_step_mA, margin_index * self.margin_step
+
+    def vref(self, max_current_mA, safety_margin):
+        """Vref for a grid point, O(1)."""
+        current_index = self.grid_index(max_current_mA, self.current_step_mA, self.current_count, "Current")
+        margin_index = self.grid_index(safety_margin, self.margin_step, self.margin_count, "Margin")
+        return self.values[current_index * self.margin_count + margin_index]
+
+    def matches(self, vref, tolerance=0.005):
+        """All (max current, safety margin) settings whose Vref is within tolerance."""
+        start = bisect_left(self.sorted_values, vref - tolerance)
+        stop = bisect_right(self.sorted_values, vref + tolerance)
+        return [self.settings(self.order[i]) for i in range(start, stop)]
+
+    def phase_current_mA(self, vref):
+        """Phase current in mA the driver delivers for a measured Vref.
+
+        Interpolates between the neighbouring table entries, which is exact because
+        Vref is linear in the effective current.
+        """
+        sorted_values = self.sorted_values
+        if not sorted_values[0] <= vref <= sorted_values[-1]:
+            raise ValueError(f"Vref {vref} V is outside the table range {sorted_values[0]:.3f} - {sorted_values[-1]:.3f} V")
+        i = bisect_left(sorted_values, vref)
+        if sorted_values[i] == vref:
+            return self.effective_current_mA(self.order[i])
+        lower, upper = i - 1, i
+        current_lower = self.effective_current_mA(self.order[lower])
+        current_upper = self.effective_current_mA(self.order[upper])
+        fraction = (vref - sorted_values[lower]) / (sorted_values[upper] - sorted_values[lower])
+        return current_lower + fraction * (current_upper - current_lower)
+
+    def effective_current_mA(self, flat_index):
+        max_current_mA, safety_margin = self.settings(flat_index)
+        return max_current_mA * (1 - safety_margin/100)
+
+    def grid(self):
+        return (self.max_current_mA, self.current_step_mA, self.max_margin, self.margin_step)
+
+    def is_current(self):
+        # A cached table is stale if the driver's slider range or formula changed since it was written
+        spec = DRIVERS[self.driver]
+        if (self.max_current_mA, self.current_step_mA) != (spec.max_current_mA, spec.current_step_mA):
+            return False
+        max_current_mA, safety_margin = self.settings(len(self.values) - 1)
+        return self.values[-1] == reference_voltage(self.driver, max_current_mA, safety_margin, self.resistor)
+
+
+def table_key(driver, resistor=None):
+    # Drivers without sense resistor options have a single table
+    spec = DRIVERS.get(driver)
+    if spec is None:
+        raise ValueError(f"Unknown driver type: {driver!r}")
+    if not spec.uses_resistor:
+        resistor = None
+    elif resistor is None:
+        resistor = spec.sense_resistors[0]
+    return driver, resistor
+
+
+def build_tables(**grid):
+    tables = {}
+    for driver in DRIVER_NAMES:
+        for resistor in DRIVERS[driver].sense_resistors or (None,):
+            table = VrefTable(driver, resistor, **grid)
+            tables[table.key] = table
+    return tables
+
+
+def save_tables(path, tables):
+    with open(path, "wb") as file:
+        file.write(CACHE_MAGIC)
+        file.write(struct.pack("<I", len(tables)))
+        for table in tables.values():
+            name = table.driver.encode()
+            resistor = math.nan if table.resistor is None else table.resistor
+            file.write(struct.pack("<H", len(name)) + name)
+            file.write(struct.pack("<5dI", resistor, *table.grid(), len(table.values)))
+            table.values.tofile(file)
+            table.order.tofile(file)
+
+
+def load_tables(path):
+    tables = {}
+    with open(path, "rb") as file:
+        if file.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+            raise ValueError(f"{path} is not a Vref table cache")
+        (count,) = struct.unpack("<I", file.read(4))
+        for _ in range(count):
+            (name_length,) = struct.unpack("<H", file.read(2))
+            driver = file.read(name_length).decode()
+            resistor, *grid, size = struct.unpack("<5dI", file.read(struct.calcsize("<5dI")))
+            values = array('d')
+            values.fromfile(file, size)
+            order = array('I')
+            order.fromfile(file, size)
+            table = VrefTable(driver, None if math.isnan(resistor) else resistor, *grid, values=values, order=order)
+            tables[table.key] = table
+    return tables
+
+
+_tables = None
+
+def get_tables(cache_path=None):
+    """Tables for all drivers, built once per process.
+
+    With cache_path the tables are loaded from that file, or built and written to it
+    if it does not exist, is unreadable or was built for other drivers.
+    """
+    global _tables
+    if _tables is not None:
+        return _tables
+
+    tables = None
+    if cache_path is not None and os.path.exists(cache_path):
+        try:
+            tables = load_tables(cache_path)
+        except (OSError, ValueError, EOFError, struct.error):
+            tables = None
+        if tables is not None and (set(tables) != set(table_keys()) or not all(table.is_current() for table in tables.values())):
+            tables = None
+    if tables is None:
+        tables = build_tables()
+        if cache_path is not None:
+            save_tables(cache_path, tables)
+    _tables = tables
+    return _tables
+
+
+def table_keys():
+    return [table_key(driver, resistor) for driver in DRIVER_NAMES for resistor in DRIVERS[driver].sense_resistors or (None,)]
+
+
+def get_table(driver, resistor=None, cache_path=None):
+    key = table_key(driver, resistor)
+    tables = get_tables(cache_path)
+    if key not in tables:
+        raise ValueError(f"No Vref table for {driver} with resistor {resistor}")
+    return tables[key]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Phase current for a measured Vref")
+    parser.add_argument("driver", choices=DRIVER_NAMES)
+    parser.add_argument("vref", type=float, help="measured reference voltage in V")
+    parser.add_argument("--resistor", type=float, help="sense resistor in Ohm")
+    parser.add_argument("--cache", help="table cache file")
+    args = parser.parse_args(argv)
+
+    # Unknown resistors and readings outside the table are input mistakes, not crashes
+    try:
+        table = get_table(args.driver, args.resistor, args.cache)
+        phase_current_mA = table.phase_current_mA(args.vref)
+    except ValueError as error:
+        parser.error(str(error))
+    print(f"Phase current: {phase_current_mA:.0f} mA")
+    for max_current_mA, safety_margin in table.matches(args.vref):
+        print(f"  {max_current_mA:5.0f} mA with {safety_margin:2.0f} % margin")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# Microstep coil current tables.
+# For a max current and safety margin, the driver's coil currents over one electrical cycle
+# (4 full steps) follow a cosine (phase A) and sine (phase B) with the effective current as
+# amplitude. Tables for many configurations are computed at once as an outer product of
+# amplitudes and the driver's sine table, without per-step Python loops.
+#
+# Export format, for build systems that map the data without parsing it:
+#   NAME.bin   raw C-order array [configuration][phase A, B][microstep], little endian
+#   NAME.json  manifest with dtype, shape, units and the (max current, margin) of every row
+#
+# usage: python waveform.py OUTPUT_DIR [--driver NAME ...] [--margin-step 1] [--dtype int16]
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from drivers import DRIVERS
+from vref import effective_current
+
+DTYPES = ("int16", "int32", "float32", "float64")
+
+
+def electrical_angles(microsteps):
+    # One electrical cycle is 4 full steps of `microsteps` steps each
+    return np.arange(4 * microsteps) * (np.pi / 2 / microsteps)
+
+
+def current_tables(max_current_mA, safety_margin, microsteps, dtype="float64"):
+    """Coil currents in mA, shape (configurations, 2, 4 * microsteps).
+
+    max_current_mA and safety_margin are broadcast against each other. Index 0 of the
+    second axis is phase A (cosine), index 1 phase B (sine). Integer dtypes are rounded.
+    """
+    amplitude = effective_current(np.asarray(max_current_mA, dtype=np.float64), np.asarray(safety_margin, dtype=np.float64)) * 1000
+    amplitude = np.atleast_1d(amplitude).reshape(-1)
+    angles = electrical_angles(microsteps)
+    unit = np.stack((np.cos(angles), np.sin(angles)))  # (2, steps)
+    tables = amplitude[:, None, None] * unit[None, :, :]
+    if np.dtype(dtype).kind in "iu":
+        tables = np.rint(tables)
+    return tables.astype(dtype)
+
+
+def driver_grid(spec, margin_step=1, max_margin=50):
+    # Every (max current, margin) setting the GUI sliders offer for this driver
+    currents = np.arange(0, spec.max_current_mA + spec.current_step_mA / 2, spec.current_step_mA, dtype=np.float64)
+    margins = np.arange(0, max_margin + margin_step / 2, margin_step, dtype=np.float64)
+    current_grid, margin_grid = np.meshgrid(currents, margins, indexing="ij")
+    return current_grid.reshape(-1), margin_grid.reshape(-1)
+
+
+def driver_tables(spec, margin_step=1, max_margin=50, dtype="int16"):
+    """(currents, margins, tables) for every slider setting of a driver."""
+    currents, margins = driver_grid(spec, margin_step, max_margin)
+    return currents, margins, current_tables(currents, margins, spec.microsteps, dtype)
+
+
+def write_tables(directory, name, spec, currents, margins, tables):
+    # Raw blob written through a memory map, plus the JSON manifest describing it
+    blob_path = os.path.join(directory, f"{name}.bin")
+    blob = np.memmap(blob_path, dtype=tables.dtype.newbyteorder("<"), mode="w+", shape=tables.shape)
+    blob[:] = tables
+    blob.flush()
+    del blob
+
+    manifest = {
+        "driver": spec.name,
+        "microsteps": spec.microsteps,
+        "steps_per_cycle": tables.shape[2],
+        "dtype": tables.dtype.name,
+        "byte_order": "little",
+        "shape": list(tables.shape),
+        "axes": ["configuration", "phase (0 = A cosine, 1 = B sine)", "microstep"],
+        "unit": "mA",
+        "configurations": [[float(current), float(margin)] for current, margin in zip(currents, margins)],
+        "configuration_fields": ["max_current_mA", "safety_margin"],
+    }
+    with open(os.path.join(directory, f"{name}.json"), "w") as file:
+        json.dump(manifest, file)
+    return blob_path
+
+
+def load_tables(directory, name):
+    """Memory-maps a table written by write_tables, returns (manifest, array)."""
+    with open(os.path.join(directory, f"{name}.json")) as file:
+        manifest = json.load(file)
+    dtype = np.dtype(manifest["dtype"]).newbyteorder("<")
+    tables = np.memmap(os.path.join(directory, f"{name}.bin"), dtype=dtype, mode="r", shape=tuple(manifest["shape"]))
+    return manifest, tables
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate microstep coil current tables for the supported drivers")
+    parser.add_argument("output", help="output directory")
+    parser.add_argument("--driver", nargs="+", choices=list(DRIVERS), help="drivers to generate (default: all)")
+    parser.add_argument("--margin-step", type=float, default=1, help="safety margin step in %% (default 1)")
+    parser.add_argument("--dtype", choices=DTYPES, default="int16", help="table data type (default int16)")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output, exist_ok=True)
+    start = time.perf_counter()
+    for name in args.driver or DRIVERS:
+        spec = DRIVERS[name]
+        currents, margins, tables = driver_tables(spec, args.margin_step, dtype=args.dtype)
+        path = write_tables(args.output, name, spec, currents, margins, tables)
+        print(f"{path}: {tables.shape[0]} configurations x {tables.shape[2]} microsteps, {tables.nbytes / 1024:.0f} KiB")
+    print(f"done in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import io
+
+import pytest
+
+from axis_table import AxisRows, read_axes
+
+
+def column_lengths(rows):
+    return [len(column) for column in (rows.names, rows.drivers, rows.currents, rows.margins, rows.resistors, rows.vrefs)]
+
+
+def test_invalid_add_leaves_columns_unchanged():
+    rows = AxisRows()
+    rows.add("X", "A4988", 1000, 20)
+    for values in (("A4988", "abc", 20), ("A4988", 1000, None), ("NOPE", 1000, 20), ("A4988", "nan", 20)):
+        with pytest.raises(ValueError):
+            rows.add("Y", *values)
+    assert column_lengths(rows) == [1] * 6
+
+
+def test_invalid_update_leaves_row_unchanged():
+    rows = AxisRows()
+    rows.add("X", "A4988", 1000, 20, 0.1)
+    with pytest.raises(ValueError):
+        rows.update(0, "DRV8825", "abc", 20)
+    assert (rows.drivers[0], rows.currents[0], rows.resistors[0]) == ("A4988", 1000.0, 0.1)
+
+
+def test_read_axes_rejects_short_rows():
+    text = "axis,driver,max_current_mA,safety_margin,resistor\nX,A4988,1000,20,0.1\nY,A4988\n"
+    with pytest.raises(ValueError, match="line 3"):
+        read_axes(io.StringIO(text))
+
+
+def test_read_axes():
+    text = "driver,max_current_mA,safety_margin,resistor\nA4988,1000,20,\nDRV8825,1500,10,\n"
+    rows = read_axes(io.StringIO(text), first_number=3)
+    assert rows.names == ["Axis 3", "Axis 4"]
+    assert rows.resistors == [None, None]
+    rows.recompute()
+    assert rows.vrefs[0] == pytest.approx(1.0 * 0.8 * 8.0 * 0.05)
+
+
+@pytest.mark.parametrize("values", [("A4988", -100, 20), ("A4988", 2100, 20), ("TMC2208", 1300, 20), ("A4988", 1000, 51), ("A4988", 1000, -1)])
+def test_values_outside_the_driver_limits(values):
+    rows = AxisRows()
+    with pytest.raises(ValueError):
+        rows.add("X", *values)
+    assert len(rows) == 0
+
+
+def test_values_at_the_driver_limits():
+    rows = AxisRows()
+    rows.add("X", "A4988", 2000, 50)
+    rows.add("Y", "DRV8825", 0, 0)
+    rows.recompute()
+    assert min(rows.vrefs) >= 0
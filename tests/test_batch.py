@@ -0,0 +1,41 @@
+import io
+
+import pytest
+
+import batch
+
+
+def run_jsonl(text, skip_invalid):
+    outfile = io.StringIO()
+    count = batch.run(io.StringIO(text), outfile, "jsonl", skip_invalid=skip_invalid)
+    return count, outfile.getvalue()
+
+
+VALID = '{"driver": "A4988", "max_current_mA": 1000, "safety_margin": 20, "resistor": 0.05}\n'
+
+
+@pytest.mark.parametrize("invalid", ['{"driver": \n', "[1, 2]\n", '{"driver": "A4988"}\n', '{"driver": "A4988", "max_current_mA": null, "safety_margin": 20}\n'])
+def test_skip_invalid_jsonl(invalid, capsys):
+    count, output = run_jsonl(VALID + "\n" + invalid + VALID, skip_invalid=True)
+    assert count == 2
+    assert output.count("vref_V") == 2
+    assert "skipped line 3:" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("invalid", ['{"driver": \n', "[1, 2]\n"])
+def test_invalid_jsonl_reports_line(invalid):
+    with pytest.raises(ValueError, match="^line 2: "):
+        run_jsonl(VALID + invalid, skip_invalid=False)
+
+
+def test_invalid_csv_reports_line():
+    text = "driver,max_current_mA,safety_margin\nA4988,1000,20\nA4988,abc,20\n"
+    with pytest.raises(ValueError, match="^line 3: "):
+        batch.run(io.StringIO(text), io.StringIO(), "csv")
+
+
+@pytest.mark.parametrize("row", ["A4988,nan,20", "A4988,inf,20", "A4988,1000,150", "A4988,1000,20,-0.1"])
+def test_invalid_numbers_are_rejected(row):
+    text = "driver,max_current_mA,safety_margin,resistor\n" + row + "\n"
+    with pytest.raises(ValueError, match="^line 2: "):
+        batch.run(io.StringIO(text), io.StringIO(), "csv")
@@ -0,0 +1,31 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+import montecarlo
+
+
+@pytest.mark.parametrize("samples, batch_size", [(0, 1000), (-1, 1000), (1000, 0)])
+def test_invalid_sample_counts(samples, batch_size):
+    with pytest.raises(ValueError):
+        next(montecarlo.simulate("A4988", 1000, 20, samples=samples, batch_size=batch_size))
+
+
+def test_main_rejects_zero_samples():
+    with pytest.raises(SystemExit) as error:
+        montecarlo.main(["A4988", "1000", "--samples", "0"])
+    assert error.value.code == 2
+
+
+def test_simulate():
+    for result in montecarlo.simulate("A4988", 1000, 20, 0.05, 0.01, samples=100_000, batch_size=30_000, seed=1):
+        pass
+    assert result.samples == 100_000
+    assert result.mean == pytest.approx(800, rel=0.01)
+    assert result.minimum >= 800 / (1.05 * 1.01)
+
+
+@pytest.mark.parametrize("resistor_tolerance, meter_tolerance", [(1.0, 0.01), (0.01, 1.5), (-0.01, 0.01), (0.01, float("nan"))])
+def test_invalid_tolerances(resistor_tolerance, meter_tolerance):
+    with pytest.raises(ValueError):
+        next(montecarlo.simulate("A4988", 1000, 20, resistor_tolerance, meter_tolerance, samples=1000))
@@ -0,0 +1,49 @@
+import asyncio
+import json
+from http import HTTPStatus
+
+import pytest
+
+import server
+
+
+def read(data):
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await server.read_request(reader)
+    return asyncio.run(run())
+
+
+def test_negative_content_length_is_rejected():
+    with pytest.raises(server.RequestError) as error:
+        read(b"POST /vref HTTP/1.1\r\nContent-Length: -5\r\n\r\n")
+    assert error.value.status == HTTPStatus.BAD_REQUEST
+
+
+def test_request_body():
+    method, path, version, headers, body = read(b"POST /vref HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}")
+    assert (method, path, body) == ("POST", "/vref", b"{}")
+
+
+@pytest.mark.parametrize("field", ["max_current_mA", "safety_margin", "resistor"])
+@pytest.mark.parametrize("value", ["nan", "inf", "-Infinity"])
+def test_non_finite_values_are_rejected(field, value):
+    query = {"driver": "A4988", "max_current_mA": 1000, "safety_margin": 20, field: value}
+    with pytest.raises(server.RequestError) as error:
+        server.handle_vref(json.dumps(query))
+    assert error.value.status == HTTPStatus.BAD_REQUEST
+    assert "error" in json.loads(json.dumps(server.handle_vref(json.dumps([query]))[0]))
+
+
+@pytest.mark.parametrize("missing", ["driver", "max_current_mA", "safety_margin"])
+def test_missing_fields_are_rejected(missing):
+    query = {"driver": "A4988", "max_current_mA": 1000, "safety_margin": 20}
+    del query[missing]
+    with pytest.raises(server.RequestError) as error:
+        server.handle_vref(json.dumps(query))
+    assert error.value.status == HTTPStatus.BAD_REQUEST
+    results = server.handle_vref(json.dumps([query, {"driver": "A4988", "max_current_mA": 1000, "safety_margin": 20}]))
+    assert results[0] == {"error": f"missing field '{missing}'"}
+    assert "vref_V" in results[1]
@@ -0,0 +1,48 @@
+import pytest
+
+import sweep
+from drivers import DRIVERS
+from vref_table import VrefTable
+
+
+@pytest.mark.parametrize("step", [300, 70, 0.1, 100])
+def test_sweep_stays_within_driver_limits(step):
+    for task in sweep.tasks(current_step_mA=step, margin_step=7):
+        assert (task.stop - 1) * step <= DRIVERS[task.driver].max_current_mA + 1e-9
+    front = sweep.pareto_front(1000, tolerance_mA=300, current_step_mA=max(step, 10), margin_step=7, workers=1)
+    assert front
+    for result in front:
+        assert result.max_current_mA <= DRIVERS[result.driver].max_current_mA
+        assert result.safety_margin <= 50
+
+
+def test_table_grid_stays_within_limits():
+    table = VrefTable("A4988", 0.1, current_step_mA=300, margin_step=7)
+    assert (table.current_count - 1) * 300 <= 2000
+    assert (table.margin_count - 1) * 7 <= 50
+
+
+@pytest.mark.parametrize("target, tolerance", [(1000, 10), (0, 5), (1234, 0.5), (2400, 100)])
+def test_filtered_evaluate_matches_full_grid(target, tolerance):
+    for task in sweep.tasks(current_step_mA=10, margin_step=5):
+        expected = sweep.near_target(sweep.evaluate(task), target, tolerance)
+        assert sweep.near_target(sweep.evaluate(task, target, tolerance), target, tolerance) == expected
+
+
+def test_front_is_not_biased_to_the_low_end_of_the_band():
+    front = sweep.pareto_front(1000, tolerance_mA=10, current_step_mA=0.1, workers=1)
+    assert front
+    for result in front:
+        assert result.effective_current_mA == pytest.approx(1000)
+
+
+def test_power_is_compared_at_the_target():
+    low = sweep.SweepResult("A4988", 0.1, 1100, 10, 0.0, 990.0, 0.098, 0.735)
+    exact = sweep.SweepResult("A4988", 0.1, 1250, 20, 0.0, 1000.0, 0.1, 0.75)
+    assert sweep.pareto([low, exact], 1000) == [exact]
+
+
+@pytest.mark.parametrize("arguments", [{"current_step_mA": 0}, {"current_step_mA": -10}, {"margin_step": 0}, {"tolerance_mA": -1}])
+def test_invalid_steps_are_rejected(arguments):
+    with pytest.raises(ValueError):
+        sweep.pareto_front(1000, workers=1, **arguments)
@@ -0,0 +1,39 @@
+import tkinter as tk
+from types import SimpleNamespace
+
+import pytest
+
+import main
+import tracing
+
+
+@pytest.fixture
+def tracer(monkeypatch, tmp_path):
+    tracer = tracing.Tracer(str(tmp_path / "trace.json"))
+    monkeypatch.setattr(tracing, "tracer", tracer)
+    for cls, name in ((main.MainMenu, "change_frame"), (main.DriverFrame, "update_slider_labels"),
+                      (main.DriverFrame, "calculate_reference_voltage")):
+        monkeypatch.setattr(cls, name, getattr(cls, name))
+    return tracer
+
+
+def test_tracing_wraps_only_called_handlers(tracer):
+    main.enable_tracing()
+    assert main.App.update is tk.Misc.update
+    assert main.App.update_idletasks is tk.Misc.update_idletasks
+    assert getattr(main.DriverFrame.calculate_reference_voltage, "__wrapped_by_tracer__", False)
+    assert getattr(main.MainMenu.change_frame, "__wrapped_by_tracer__", False)
+
+
+def test_loop_iterations_are_not_in_slowest(tracer):
+    iterations = []
+
+    def dooneevent(flags):
+        iterations.append(flags)
+        if len(iterations) == 3:
+            app.turned_on = False
+
+    app = SimpleNamespace(turned_on=True, tk=SimpleNamespace(dooneevent=dooneevent), loop_stats=SimpleNamespace(iterations=0))
+    main.App.run_traced(app, tracer)
+    assert tracer.buffer("App.run iteration (cpu)").count == 3
+    assert tracer.slowest == []
@@ -0,0 +1,59 @@
+import pytest
+
+from drivers import DRIVERS
+from vref import DRIVER_NAMES, parse_query, reference_voltage, reference_voltage_batch
+
+
+def test_parse_query_converts_strings():
+    assert parse_query("A4988", "1000", "20", "0.1") == ("A4988", 1000.0, 20.0, 0.1)
+    assert parse_query("DRV8825", 1000, 20, "") == ("DRV8825", 1000.0, 20.0, None)
+
+
+@pytest.mark.parametrize("query", [
+    ("NOPE", 1000, 20, None), (None, 1000, 20, None), (["A4988"], 1000, 20, None),
+    ("A4988", "abc", 20, None), ("A4988", None, 20, None),
+    ("A4988", "nan", 20, None), ("A4988", 1000, "inf", None), ("A4988", 1000, 20, "-inf"),
+    ("A4988", -1, 20, None), ("A4988", 1000, -1, None), ("A4988", 1000, 150, None), ("A4988", 1000, 20, 0),
+])
+def test_parse_query_rejects_invalid_input(query):
+    with pytest.raises(ValueError):
+        parse_query(*query)
+
+
+CURRENTS = [0, 100, 850, 1000, 1234.5, 2000, 2500]
+MARGINS = [0, 12.5, 20, 50]
+
+
+@pytest.fixture
+def numpy():
+    return pytest.importorskip("numpy")
+
+
+@pytest.mark.parametrize("driver", DRIVER_NAMES)
+def test_batch_matches_scalar(numpy, driver):
+    spec = DRIVERS[driver]
+    # None/NaN is the default resistor; drivers without options ignore the resistor
+    resistors = [None, *spec.sense_resistors, 0.2]
+    configs = [(current, margin, resistor) for current in CURRENTS for margin in MARGINS for resistor in resistors]
+    currents = [current for current, _, _ in configs]
+    margins = [margin for _, margin, _ in configs]
+    resistor_array = numpy.array([numpy.nan if resistor is None else resistor for _, _, resistor in configs])
+    expected = [reference_voltage(driver, *config) for config in configs]
+
+    code = DRIVER_NAMES.index(driver)
+    by_name = reference_voltage_batch([driver] * len(configs), currents, margins, resistor_array)
+    by_code = reference_voltage_batch(numpy.full(len(configs), code), currents, margins, resistor_array)
+    numpy.testing.assert_allclose(by_name, expected, rtol=1e-15, atol=0)
+    numpy.testing.assert_array_equal(by_code, by_name)
+
+    # Without resistor argument every driver uses its default
+    default = reference_voltage_batch(numpy.full(len(CURRENTS), code), CURRENTS, 20)
+    numpy.testing.assert_allclose(default, [reference_voltage(driver, current, 20) for current in CURRENTS], rtol=1e-15, atol=0)
+
+
+def test_batch_mixed_drivers(numpy):
+    codes = numpy.arange(len(DRIVER_NAMES)).repeat(3)
+    currents = numpy.tile([500.0, 1000.0, 1500.0], len(DRIVER_NAMES))
+    result = reference_voltage_batch(codes, currents, 20)
+    expected = [reference_voltage(DRIVER_NAMES[code], current, 20) for code, current in zip(codes, currents)]
+    numpy.testing.assert_allclose(result, expected, rtol=1e-15, atol=0)
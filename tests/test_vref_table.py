@@ -0,0 +1,74 @@
+import pytest
+
+import vref_table
+from drivers import DRIVERS, DriverSpec
+from vref import reference_voltage
+from vref_table import VrefTable
+
+
+@pytest.fixture
+def table():
+    return VrefTable("A4988", 0.1)
+
+
+def test_vref_matches_formula(table):
+    for current in (0, 100, 1000, 2000):
+        for margin in (0, 20, 50):
+            assert table.vref(current, margin) == reference_voltage("A4988", current, margin, 0.1)
+
+
+@pytest.mark.parametrize("current, margin", [(150, 20), (2100, 20), (1000, 51), (1000, 0.5)])
+def test_vref_off_grid(table, current, margin):
+    with pytest.raises(ValueError):
+        table.vref(current, margin)
+
+
+def test_matches(table):
+    vref = reference_voltage("A4988", 1000, 20, 0.1)
+    matches = table.matches(vref, tolerance=1e-9)
+    assert (1000, 20) in matches
+    for current, margin in matches:
+        assert reference_voltage("A4988", current, margin, 0.1) == pytest.approx(vref)
+
+
+@pytest.mark.parametrize("current_mA", [0, 800, 1234.5, 2000])
+def test_phase_current(table, current_mA):
+    vref = reference_voltage("A4988", current_mA, 0, 0.1)
+    assert table.phase_current_mA(vref) == pytest.approx(current_mA)
+
+
+def test_phase_current_out_of_range(table):
+    with pytest.raises(ValueError):
+        table.phase_current_mA(5)
+
+
+def test_cache_round_trip(tmp_path):
+    path = tmp_path / "tables.bin"
+    tables = vref_table.build_tables()
+    vref_table.save_tables(path, tables)
+    loaded = vref_table.load_tables(path)
+    assert set(loaded) == set(tables)
+    for key, table in tables.items():
+        assert loaded[key].values == table.values
+        assert loaded[key].order == table.order
+        assert loaded[key].grid() == table.grid()
+        assert loaded[key].is_current()
+
+
+def test_stale_cache_is_rebuilt(tmp_path, monkeypatch):
+    path = tmp_path / "tables.bin"
+    vref_table.save_tables(path, vref_table.build_tables())
+    spec = DRIVERS["A4988"]
+    monkeypatch.setitem(DRIVERS, "A4988", DriverSpec("A4988", spec.max_current_mA, spec.vref_gain * 2, spec.sense_resistors))
+    monkeypatch.setattr(vref_table, "_tables", None)
+    assert not all(table.is_current() for table in vref_table.load_tables(path).values())
+    table = vref_table.get_table("A4988", 0.1, path)
+    assert table.vref(1000, 20) == reference_voltage("A4988", 1000, 20, 0.1)
+    assert all(table.is_current() for table in vref_table.load_tables(path).values())
+
+
+@pytest.mark.parametrize("argv", [["A4988", "0.5", "--resistor", "0.07"], ["A4988", "5"]])
+def test_main_reports_input_errors(argv):
+    with pytest.raises(SystemExit) as error:
+        vref_table.main(argv)
+    assert error.value.code == 2
@@ -0,0 +1,46 @@
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import waveform
+from drivers import DRIVERS
+
+
+def test_current_tables_shape_and_values():
+    tables = waveform.current_tables([1000, 2000], [20, 0], 16)
+    assert tables.shape == (2, 2, 64)
+    angles = np.arange(64) * (math.pi / 32)
+    np.testing.assert_allclose(tables[0, 0], 800 * np.cos(angles), atol=1e-9)
+    np.testing.assert_allclose(tables[1, 1], 2000 * np.sin(angles), atol=1e-9)
+    # Full step positions: phase A at full current, then phase B
+    assert tables[0, 0, 0] == pytest.approx(800)
+    assert tables[0, 1, 16] == pytest.approx(800)
+
+
+def test_current_tables_integer_dtype_is_rounded():
+    tables = waveform.current_tables(1000, 20, 256, dtype="int16")
+    assert tables.dtype == np.int16
+    np.testing.assert_array_equal(tables, np.rint(waveform.current_tables(1000, 20, 256)))
+
+
+def test_driver_tables_cover_the_slider_grid():
+    spec = DRIVERS["A4988"]
+    currents, margins, tables = waveform.driver_tables(spec, margin_step=10)
+    assert currents.max() == spec.max_current_mA
+    assert margins.max() == 50
+    assert tables.shape == (len(currents), 2, 4 * spec.microsteps)
+
+
+@pytest.mark.parametrize("dtype", waveform.DTYPES)
+def test_write_and_load_round_trip(tmp_path, dtype):
+    spec = DRIVERS["TMC2209"]
+    currents, margins, tables = waveform.driver_tables(spec, margin_step=25, dtype=dtype)
+    waveform.write_tables(tmp_path, "TMC2209", spec, currents, margins, tables)
+    manifest, loaded = waveform.load_tables(tmp_path, "TMC2209")
+    assert manifest["shape"] == list(tables.shape)
+    assert manifest["dtype"] == dtype
+    assert manifest["configurations"] == [[float(c), float(m)] for c, m in zip(currents, margins)]
+    np.testing.assert_array_equal(loaded, tables)
+    assert (tmp_path / "TMC2209.bin").stat().st_size == tables.nbytes